@@ -0,0 +1,80 @@
+import asyncio
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from app.store.catalog import LibraryCatalog, ready_catalog
+from app.store.catalog_io import CATALOG_FORMATS, export_books
+from app.store.covers import (
+    ISBN_PATTERN,
+    PLACEHOLDER_SVG,
+    THUMBNAIL_SIZES,
+    get_cover_cache,
+)
+from app.store.metrics import payload_metrics
+from app.store.users import get_user_directory
+
+COVER_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _placeholder() -> Response:
+    return Response(
+        PLACEHOLDER_SVG,
+        media_type="image/svg+xml",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
+async def cover(request: Request) -> Response:
+    size = request.path_params["size"]
+    isbn = request.path_params["isbn"]
+    if size not in THUMBNAIL_SIZES or not ISBN_PATTERN.fullmatch(isbn):
+        return _placeholder()
+    image = await get_cover_cache().get(isbn, size)
+    if image is None:
+        return _placeholder()
+    headers = {"ETag": image["etag"], "Cache-Control": COVER_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if image["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(image["data"], media_type="image/webp", headers=headers)
+
+
+async def metrics(request: Request) -> Response:
+    catalog = await ready_catalog()
+    return JSONResponse(
+        {
+            "payloads": payload_metrics.stats(),
+            "query_cache": catalog.query_cache.stats(),
+        }
+    )
+
+
+async def _export_chunks(catalog: LibraryCatalog, fmt: str):
+    for chunk in export_books(catalog, fmt):
+        yield chunk
+        await asyncio.sleep(0)
+
+
+async def export(request: Request) -> Response:
+    fmt = request.path_params["fmt"]
+    if fmt not in CATALOG_FORMATS:
+        return Response(status_code=404)
+    token = request.query_params.get("token", "")
+    user = get_user_directory().verify_download_token(token)
+    if user is None or user["role"] != "Librarian":
+        return Response(status_code=403)
+    return StreamingResponse(
+        _export_chunks(await ready_catalog(), fmt),
+        media_type=CATALOG_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="books.{fmt}"'},
+    )
+
+
+api = Starlette(
+    routes=[
+        Route("/covers/{size}/{isbn}.webp", cover),
+        Route("/metrics", metrics),
+        Route("/export/books.{fmt}", export),
+    ]
+)
@@ -6,8 +6,15 @@ from app.pages.books import books_page
 from app.pages.manage_books import manage_books_page
 from app.pages.users import users_page
 from app.pages.code_page import code_page
+from app.api import api
+from app.middleware import PayloadMetricsMiddleware
+from app.store.catalog import catalog_lifespan
+from app.store.metrics import PAYLOAD_METRICS_ENABLED
+from app.store.notifications import notifications_lifespan
+from app.store.users import users_lifespan
 
 app = rx.App(
+    api_transformer=api,
     theme=rx.theme(appearance="light"),
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
@@ -24,4 +31,9 @@ app.add_page(dashboard_page, route="/dashboard")
 app.add_page(books_page, route="/books")
 app.add_page(manage_books_page, route="/manage-books")
 app.add_page(users_page, route="/users")
-app.add_page(code_page, route="/code")
\ No newline at end of file
+app.add_page(code_page, route="/code")
+app.register_lifespan_task(users_lifespan)
+app.register_lifespan_task(catalog_lifespan)
+app.register_lifespan_task(notifications_lifespan)
+if PAYLOAD_METRICS_ENABLED:
+    app.add_middleware(PayloadMetricsMiddleware())
\ No newline at end of file
@@ -0,0 +1,300 @@
+import argparse
+import datetime
+import itertools
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+import numpy as np
+from app.data_generator import (
+    Category,
+    desc_parts1,
+    desc_parts2,
+    desc_parts3,
+    desc_parts4,
+    first_names,
+    last_names,
+    title_parts1,
+    title_parts2,
+    title_parts3,
+)
+
+DEFAULT_CHUNK_SIZE = 100000
+BORROWED_RATIO = 0.2
+RESERVED_RATIO = 0.3
+TEACHER_EVERY = 10
+LOAN_DAYS = (-14, 21)
+BOOK_STREAM = 0
+TABLE_COLUMNS = {
+    "users": ("username", "name", "role", "password_hash"),
+    "books": (
+        "id",
+        "title",
+        "author",
+        "category",
+        "cover_image_url",
+        "is_available",
+        "description",
+        "isbn",
+        "publication_year",
+    ),
+    "loans": ("book_id", "user_username", "due_date"),
+    "reservations": ("book_id", "user_username", "timestamp", "role"),
+}
+CATEGORIES = np.array(Category.__args__)
+TITLES = np.array(
+    [
+        f"{a} {b} {c}"
+        for a, b, c in itertools.product(title_parts1, title_parts2, title_parts3)
+    ]
+)
+AUTHORS = np.array([f"{a} {b}" for a, b in itertools.product(first_names, last_names)])
+DESCRIPTIONS = np.array(
+    [
+        f"{a} {b}, {c} {d}"
+        for a, b, c, d in itertools.product(
+            desc_parts1, desc_parts2, desc_parts3, desc_parts4
+        )
+    ]
+)
+
+Columns = dict[str, np.ndarray]
+
+
+def _pick(rng: np.random.Generator, values: np.ndarray, size: int) -> np.ndarray:
+    return values[rng.integers(0, len(values), size)]
+
+
+def _digits(rng: np.random.Generator, low: int, high: int, size: int) -> np.ndarray:
+    return rng.integers(low, high, size).astype(str)
+
+
+def _join(*parts) -> np.ndarray:
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+def usernames(indexes: np.ndarray) -> np.ndarray:
+    return np.char.add("user", np.char.zfill(indexes.astype(str), 8))
+
+
+def user_roles(indexes: np.ndarray) -> np.ndarray:
+    return np.where(indexes % TEACHER_EVERY == 0, "Teacher", "Student")
+
+
+def generate_users(
+    num_users: int, password_hash: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Columns]:
+    for start in range(0, num_users, chunk_size):
+        indexes = np.arange(start, min(start + chunk_size, num_users))
+        yield {
+            "username": usernames(indexes),
+            "name": np.char.add(
+                np.char.add(
+                    np.array(first_names)[indexes % len(first_names)], " "
+                ),
+                np.array(last_names)[(indexes // len(first_names)) % len(last_names)],
+            ),
+            "role": user_roles(indexes),
+            "password_hash": np.full(len(indexes), password_hash),
+        }
+
+
+def generate_books(
+    num_books: int,
+    num_users: int,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    base_date: datetime.date | None = None,
+) -> Iterator[tuple[Columns, Columns, Columns]]:
+    today = np.datetime64(base_date or datetime.date.today(), "D")
+    for chunk, start in enumerate(range(0, num_books, chunk_size)):
+        rng = np.random.default_rng([seed, BOOK_STREAM, chunk])
+        size = min(chunk_size, num_books - start)
+        ids = np.arange(start + 1, start + size + 1)
+        isbn = _join(
+            _digits(rng, 100, 1000, size),
+            "-",
+            _digits(rng, 10, 100, size),
+            "-",
+            _digits(rng, 1000, 10000, size),
+            "-",
+            _digits(rng, 100000, 1000000, size),
+            "-",
+            _digits(rng, 0, 10, size),
+        )
+        borrowed = rng.random(size) < BORROWED_RATIO
+        books = {
+            "id": ids,
+            "title": _pick(rng, TITLES, size),
+            "author": _pick(rng, AUTHORS, size),
+            "category": _pick(rng, CATEGORIES, size),
+            "cover_image_url": _join(
+                "https://picsum.photos/seed/", isbn, "/400/600"
+            ),
+            "is_available": ~borrowed,
+            "description": _pick(rng, DESCRIPTIONS, size),
+            "isbn": isbn,
+            "publication_year": rng.integers(1950, 2025, size),
+        }
+        loan_ids = ids[borrowed]
+        borrowers = rng.integers(0, num_users, len(loan_ids))
+        due_dates = today + rng.integers(*LOAN_DAYS, len(loan_ids), endpoint=True)
+        loans = {
+            "book_id": loan_ids,
+            "user_username": usernames(borrowers),
+            "due_date": due_dates.astype(str),
+        }
+        reserved = rng.random(len(loan_ids)) < RESERVED_RATIO
+        reservers = np.empty(0, dtype=np.int64)
+        if num_users > 1:
+            reservers = (
+                borrowers[reserved]
+                + rng.integers(1, num_users, int(reserved.sum()))
+            ) % num_users
+        else:
+            reserved[:] = False
+        waited = rng.integers(0, 14 * 24 * 3600, len(reservers))
+        reservations = {
+            "book_id": loan_ids[reserved],
+            "user_username": usernames(reservers),
+            "timestamp": (
+                today.astype("datetime64[s]") - waited.astype("timedelta64[s]")
+            ).astype(str),
+            "role": user_roles(reservers),
+        }
+        yield books, loans, reservations
+
+
+def generate_dataset(
+    num_books: int,
+    num_users: int,
+    password_hash: str,
+    seed: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    base_date: datetime.date | None = None,
+) -> Iterator[tuple[str, Columns]]:
+    for users in generate_users(num_users, password_hash, chunk_size):
+        yield "users", users
+    for books, loans, reservations in generate_books(
+        num_books, num_users, seed, chunk_size, base_date
+    ):
+        yield "books", books
+        yield "loans", loans
+        yield "reservations", reservations
+
+
+def _rows(table: str, columns: Columns):
+    return zip(*(columns[name].tolist() for name in TABLE_COLUMNS[table]))
+
+
+def write_sqlite(path: str, dataset: Iterator[tuple[str, Columns]]) -> dict[str, int]:
+    from app.store.db import LibraryDatabase
+    from app.store.users import get_initial_users, hash_password
+
+    db = LibraryDatabase(path)
+    counts = dict.fromkeys(TABLE_COLUMNS, 0)
+    try:
+        for username, password, name, role in get_initial_users():
+            db.save_user(username, name, role, hash_password(password))
+        for table, columns in dataset:
+            names = TABLE_COLUMNS[table]
+            rows = _rows(table, columns)
+            if table == "books":
+                names = (*names, "position")
+                rows = (
+                    (*row, position)
+                    for row, position in zip(rows, columns["id"].tolist())
+                )
+            db.insert_rows(table, names, rows)
+            counts[table] += len(columns[TABLE_COLUMNS[table][0]])
+    finally:
+        db.close()
+    return counts
+
+
+def write_jsonl(directory: str, dataset: Iterator[tuple[str, Columns]]) -> dict[str, int]:
+    os.makedirs(directory, exist_ok=True)
+    files = {
+        table: open(os.path.join(directory, f"{table}.jsonl"), "w")
+        for table in TABLE_COLUMNS
+    }
+    counts = dict.fromkeys(TABLE_COLUMNS, 0)
+    try:
+        for table, columns in dataset:
+            names = TABLE_COLUMNS[table]
+            files[table].writelines(
+                json.dumps(dict(zip(names, row))) + "\n"
+                for row in _rows(table, columns)
+            )
+            counts[table] += len(columns[names[0]])
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def write_parquet(
+    directory: str, dataset: Iterator[tuple[str, Columns]]
+) -> dict[str, int]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet output requires the pyarrow package.") from e
+    os.makedirs(directory, exist_ok=True)
+    writers = {}
+    counts = dict.fromkeys(TABLE_COLUMNS, 0)
+    try:
+        for table, columns in dataset:
+            batch = pa.table({name: columns[name] for name in TABLE_COLUMNS[table]})
+            if table not in writers:
+                writers[table] = pq.ParquetWriter(
+                    os.path.join(directory, f"{table}.parquet"), batch.schema
+                )
+            writers[table].write_table(batch)
+            counts[table] += batch.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return counts
+
+
+WRITERS = {"sqlite": write_sqlite, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Generate a reproducible library dataset for load testing."
+    )
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="sqlite")
+    parser.add_argument("--books", type=int, default=1000000)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--base-date", type=datetime.date.fromisoformat)
+    args = parser.parse_args(argv)
+    from app.store.users import hash_password
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    dataset = generate_dataset(
+        args.books,
+        args.users or max(args.books // 20, 1),
+        hash_password("password"),
+        args.seed,
+        args.chunk_size,
+        args.base_date,
+    )
+    counts = WRITERS[args.format](args.output, dataset)
+    logging.info(
+        f"Wrote {counts} to {args.output} in {time.perf_counter() - started:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
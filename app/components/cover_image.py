@@ -0,0 +1,14 @@
+import reflex as rx
+from reflex.vars.function import FunctionStringVar
+
+COVERS_URL = f"{rx.config.get_config().api_url}/covers"
+ENCODE_URI_COMPONENT = FunctionStringVar.create("encodeURIComponent")
+
+
+def cover_src(book: rx.Var, size: str) -> rx.Var:
+    version = ENCODE_URI_COMPONENT.call(book["cover_image_url"]).to(str)
+    return rx.cond(
+        book["isbn"],
+        f"{COVERS_URL}/{size}/" + book["isbn"] + ".webp?v=" + version,
+        book["cover_image_url"],
+    )
@@ -0,0 +1,18 @@
+import reflex as rx
+from reflex.event import Event
+from reflex.middleware import Middleware
+from reflex.state import BaseState, StateUpdate
+from app.store.metrics import payload_metrics
+
+
+class PayloadMetricsMiddleware(Middleware):
+    async def preprocess(
+        self, app: rx.App, state: BaseState, event: Event
+    ) -> StateUpdate | None:
+        return None
+
+    async def postprocess(
+        self, app: rx.App, state: BaseState, event: Event, update: StateUpdate
+    ) -> StateUpdate:
+        payload_metrics.record(event.name.rsplit(".", 1)[-1], len(update.json()))
+        return update
@@ -2,6 +2,7 @@ import reflex as rx
 from app.states.auth_state import AuthState
 from app.states.book_state import BookState, Book, Category, Reservation
 from app.components.base_layout import base_layout
+from app.components.cover_image import cover_src
 
 
 def availability_badge(is_available: rx.Var[bool]) -> rx.Component:
@@ -20,7 +21,7 @@ def book_card(book: Book) -> rx.Component:
         rx.el.button(
             rx.el.div(
                 rx.image(
-                    src=book["cover_image_url"],
+                    src=cover_src(book, "card"),
                     alt=f"Cover of {book['title']}",
                     class_name="h-48 w-full object-cover group-hover:opacity-80 transition-opacity",
                 ),
@@ -55,7 +56,7 @@ def book_modal() -> rx.Component:
                 BookState.selected_book,
                 rx.el.div(
                     rx.image(
-                        src=BookState.selected_book["cover_image_url"],
+                        src=cover_src(BookState.selected_book, "detail"),
                         class_name="w-full h-64 object-cover rounded-t-xl",
                     ),
                     rx.el.div(
@@ -364,7 +365,7 @@ def books_content() -> rx.Component:
         ),
         rx.el.div(
             rx.el.input(
-                placeholder="Search by title or author...",
+                placeholder="Search by title, author or ISBN...",
                 on_change=BookState.set_search_query,
                 class_name="w-full lg:w-1/3 px-4 py-2 bg-white border border-gray-300 rounded-lg shadow-sm focus:border-blue-500 focus:ring-blue-500",
                 default_value=BookState.search_query,
@@ -372,8 +373,8 @@ def books_content() -> rx.Component:
             rx.el.div(
                 rx.el.select(
                     rx.foreach(
-                        BookState.all_categories,
-                        lambda cat: rx.el.option(cat, value=cat),
+                        BookState.category_options,
+                        lambda option: rx.el.option(option[1], value=option[0]),
                     ),
                     value=BookState.category_filter,
                     on_change=BookState.set_category_filter,
@@ -401,6 +402,6 @@ def books_content() -> rx.Component:
     )
 
 
-@rx.page(on_load=AuthState.check_login)
+@rx.page(on_load=[AuthState.check_login, BookState.refresh_catalog])
 def books_page() -> rx.Component:
     return base_layout(books_content())
\ No newline at end of file
@@ -19,6 +19,33 @@ def file_list_item(file_path: str) -> rx.Component:
     )
 
 
+def window_controls() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            rx.icon("chevron-left", class_name="h-4 w-4"),
+            on_click=CodeViewState.prev_window,
+            class_name="p-1 rounded-md hover:bg-gray-200",
+        ),
+        rx.el.span(CodeViewState.window_label, class_name="text-sm text-gray-600"),
+        rx.el.button(
+            rx.icon("chevron-right", class_name="h-4 w-4"),
+            on_click=CodeViewState.next_window,
+            class_name="p-1 rounded-md hover:bg-gray-200",
+        ),
+        rx.el.form(
+            rx.el.input(
+                name="line",
+                type="number",
+                placeholder="Go to line",
+                class_name="w-32 px-2 py-1 text-sm border border-gray-300 rounded-md",
+            ),
+            on_submit=CodeViewState.go_to_line,
+            reset_on_submit=True,
+        ),
+        class_name="flex items-center gap-3 px-4 py-2 border-b bg-gray-50",
+    )
+
+
 def code_view_content() -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -49,6 +76,10 @@ def code_view_content() -> rx.Component:
                                 CodeViewState.selected_file,
                                 class_name="font-mono text-sm",
                             ),
+                            rx.el.span(
+                                CodeViewState.total_lines.to_string() + " lines",
+                                class_name="text-xs text-gray-500",
+                            ),
                             class_name="flex items-center gap-2",
                         ),
                         rx.el.button(
@@ -61,6 +92,7 @@ def code_view_content() -> rx.Component:
                         ),
                         class_name="flex justify-between items-center bg-gray-100 px-4 py-2 border-b",
                     ),
+                    rx.cond(CodeViewState.windowed, window_controls()),
                     monaco(
                         value=CodeViewState.selected_file_content,
                         language=CodeViewState.language,
@@ -2,6 +2,7 @@ import reflex as rx
 from app.states.auth_state import AuthState
 from app.states.book_state import BookState, BorrowedBookWithDetails
 from app.components.base_layout import base_layout
+from app.components.cover_image import cover_src
 
 
 def stat_card(
@@ -27,7 +28,7 @@ def book_row(book_info: BorrowedBookWithDetails) -> rx.Component:
     return rx.el.tr(
         rx.el.td(
             rx.image(
-                src=book["cover_image_url"],
+                src=cover_src(book, "row"),
                 class_name="h-16 w-12 object-cover rounded-md",
             ),
             class_name="p-4",
@@ -100,12 +101,90 @@ def librarian_dashboard() -> rx.Component:
             stat_card(
                 "file-warning", "Overdue Items", BookState.overdue_books_count, "red"
             ),
+            stat_card(
+                "gauge", "Search Cache Hits", BookState.query_cache_hit_rate, "violet"
+            ),
+            stat_card(
+                "receipt", "Outstanding Fines", BookState.outstanding_fines, "rose"
+            ),
             class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6",
         ),
+        rx.el.div(
+            rx.el.button(
+                "Run Fine Accrual",
+                on_click=BookState.accrue_fines,
+                class_name="px-4 py-2 bg-rose-600 text-white font-semibold rounded-lg hover:bg-rose-700",
+            ),
+            class_name="flex justify-end mt-6",
+        ),
+        analytics_panels(),
         class_name="w-full",
     )
 
 
+def analytics_panel(title: str, *children) -> rx.Component:
+    return rx.el.div(
+        rx.el.h2(title, class_name="text-lg font-bold text-gray-800 mb-4"),
+        *children,
+        class_name="p-6 bg-white rounded-xl border border-gray-100 shadow-sm",
+    )
+
+
+def most_borrowed_row(entry: rx.Var) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p(entry["title"], class_name="font-semibold text-gray-900"),
+            rx.el.p(entry["author"], class_name="text-sm text-gray-500"),
+        ),
+        rx.el.span(entry["count"], class_name="font-bold text-blue-600"),
+        class_name="flex justify-between items-center py-2 border-b last:border-0",
+    )
+
+
+def category_row(entry: rx.Var) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.span(entry["category"], class_name="text-sm text-gray-700"),
+            rx.el.span(entry["count"], class_name="text-sm font-semibold"),
+            class_name="flex justify-between mb-1",
+        ),
+        rx.el.div(
+            rx.el.div(
+                class_name="h-2 bg-emerald-500 rounded-full",
+                style={"width": entry["percent"].to_string() + "%"},
+            ),
+            class_name="h-2 bg-gray-100 rounded-full",
+        ),
+        class_name="py-1",
+    )
+
+
+def analytics_panels() -> rx.Component:
+    return rx.el.div(
+        analytics_panel(
+            "Most Borrowed",
+            rx.foreach(BookState.most_borrowed_books, most_borrowed_row),
+        ),
+        analytics_panel(
+            "Popular Categories",
+            rx.foreach(BookState.category_popularity, category_row),
+        ),
+        analytics_panel(
+            "Borrowing Trend",
+            rx.recharts.bar_chart(
+                rx.recharts.bar(data_key="borrows", fill="#3b82f6"),
+                rx.recharts.bar(data_key="returns", fill="#10b981"),
+                rx.recharts.x_axis(data_key="day"),
+                rx.recharts.y_axis(allow_decimals=False),
+                rx.recharts.legend(),
+                data=BookState.borrowing_trend,
+                height=240,
+            ),
+        ),
+        class_name="grid grid-cols-1 lg:grid-cols-3 gap-6 mt-8",
+    )
+
+
 def student_dashboard() -> rx.Component:
     return rx.el.div(
         rx.el.h1(
@@ -122,7 +201,8 @@ def student_dashboard() -> rx.Component:
                 BookState.books_due_soon_count,
                 "amber",
             ),
-            class_name="grid grid-cols-1 md:grid-cols-2 gap-6 mb-8",
+            stat_card("receipt", "Fines Owed", BookState.current_user_fines, "rose"),
+            class_name="grid grid-cols-1 md:grid-cols-3 gap-6 mb-8",
         ),
         borrowed_books_table(BookState.current_user_borrowed_books_with_details),
         class_name="w-full flex flex-col gap-6",
@@ -154,7 +234,15 @@ def teacher_dashboard() -> rx.Component:
                 rx.el.p("10 / 15 books", class_name="text-2xl font-bold text-gray-900"),
                 class_name="p-6 bg-white rounded-xl border border-gray-100 shadow-sm",
             ),
-            class_name="grid grid-cols-1 md:grid-cols-2 gap-6 mb-8",
+            rx.el.div(
+                rx.el.p("Fines Owed", class_name="text-sm font-medium text-gray-500"),
+                rx.el.p(
+                    BookState.current_user_fines,
+                    class_name="text-2xl font-bold text-gray-900",
+                ),
+                class_name="p-6 bg-white rounded-xl border border-gray-100 shadow-sm",
+            ),
+            class_name="grid grid-cols-1 md:grid-cols-3 gap-6 mb-8",
         ),
         borrowed_books_table(BookState.current_user_borrowed_books_with_details),
         class_name="w-full flex flex-col gap-6",
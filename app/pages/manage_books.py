@@ -2,14 +2,17 @@ import reflex as rx
 from app.states.auth_state import AuthState
 from app.states.book_state import BookState, Book
 from app.components.base_layout import base_layout
+from app.components.cover_image import cover_src
 from app.pages.books import add_book_modal, edit_book_modal
 
+IMPORT_UPLOAD_ID = "catalog_import"
+
 
 def book_manage_row(book: Book) -> rx.Component:
     return rx.el.tr(
         rx.el.td(
             rx.image(
-                src=book["cover_image_url"], class_name="h-12 w-9 object-cover rounded"
+                src=cover_src(book, "row"), class_name="h-12 w-9 object-cover rounded"
             ),
             class_name="p-3",
         ),
@@ -46,18 +49,155 @@ def book_manage_row(book: Book) -> rx.Component:
     )
 
 
+def sortable_header(label: str, column: str) -> rx.Component:
+    return rx.el.th(
+        rx.el.button(
+            label,
+            rx.cond(
+                BookState.manage_sort_by == column,
+                rx.cond(
+                    BookState.manage_sort_desc,
+                    rx.icon("chevron-down", class_name="h-4 w-4"),
+                    rx.icon("chevron-up", class_name="h-4 w-4"),
+                ),
+                None,
+            ),
+            on_click=lambda: BookState.sort_manage_by(column),
+            class_name="flex items-center gap-1 font-semibold text-gray-600 hover:text-gray-900",
+        ),
+        class_name="text-left p-3",
+    )
+
+
+def manage_filters() -> rx.Component:
+    return rx.el.div(
+        rx.el.input(
+            placeholder="Search by title, author or ISBN...",
+            on_change=BookState.set_manage_query,
+            default_value=BookState.manage_query,
+            class_name="w-full lg:w-1/3 px-4 py-2 bg-white border border-gray-300 rounded-lg shadow-sm focus:border-blue-500 focus:ring-blue-500",
+        ),
+        rx.el.div(
+            rx.el.select(
+                rx.foreach(
+                    BookState.all_categories,
+                    lambda cat: rx.el.option(cat, value=cat),
+                ),
+                value=BookState.manage_category_filter,
+                on_change=BookState.set_manage_category_filter,
+                class_name="px-4 py-2 bg-white border border-gray-300 rounded-lg shadow-sm",
+            ),
+            rx.el.select(
+                rx.el.option("All Statuses", value="all"),
+                rx.el.option("Available", value="available"),
+                rx.el.option("Borrowed", value="borrowed"),
+                value=BookState.manage_availability_filter,
+                on_change=BookState.set_manage_availability_filter,
+                class_name="px-4 py-2 bg-white border border-gray-300 rounded-lg shadow-sm",
+            ),
+            class_name="flex gap-4",
+        ),
+        class_name="flex flex-col lg:flex-row justify-between items-center mb-4 gap-4",
+    )
+
+
+def manage_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.span(
+            f"{BookState.manage_total_books} books",
+            class_name="text-sm text-gray-600",
+        ),
+        rx.el.div(
+            rx.el.select(
+                rx.el.option("25 per page", value="25"),
+                rx.el.option("50 per page", value="50"),
+                rx.el.option("100 per page", value="100"),
+                value=BookState.manage_page_size.to_string(),
+                on_change=BookState.set_manage_page_size,
+                class_name="px-3 py-2 text-sm bg-white border border-gray-300 rounded-md",
+            ),
+            rx.el.button(
+                "Previous",
+                on_click=BookState.manage_prev_page,
+                disabled=BookState.manage_page <= 1,
+                class_name="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
+            ),
+            rx.el.span(
+                f"Page {BookState.manage_page} of {BookState.manage_total_pages}",
+                class_name="text-sm text-gray-700 font-medium",
+            ),
+            rx.el.button(
+                "Next",
+                on_click=BookState.manage_next_page,
+                disabled=BookState.manage_page >= BookState.manage_total_pages,
+                class_name="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
+            ),
+            class_name="flex items-center gap-4",
+        ),
+        class_name="flex justify-between items-center mt-4",
+    )
+
+
+def export_link(label: str, fmt: str) -> rx.Component:
+    return rx.el.button(
+        rx.icon("download", class_name="h-4 w-4 mr-2"),
+        label,
+        on_click=BookState.export_catalog(fmt),
+        class_name="flex items-center bg-white border border-gray-300 text-gray-700 px-4 py-2 rounded-lg font-semibold text-sm hover:bg-gray-50 transition",
+    )
+
+
+def bulk_import() -> rx.Component:
+    return rx.el.div(
+        rx.upload.root(
+            rx.el.button(
+                rx.icon("upload", class_name="h-4 w-4 mr-2"),
+                "Import CSV / JSONL",
+                class_name="flex items-center bg-white border border-gray-300 text-gray-700 px-4 py-2 rounded-lg font-semibold text-sm hover:bg-gray-50 transition",
+            ),
+            id=IMPORT_UPLOAD_ID,
+            accept={"text/csv": [".csv"], "application/x-ndjson": [".jsonl"]},
+            on_drop=BookState.import_catalog(rx.upload_files(IMPORT_UPLOAD_ID)),
+        ),
+        export_link("Export CSV", "csv"),
+        export_link("Export JSONL", "jsonl"),
+        class_name="flex items-center gap-2",
+    )
+
+
+def import_report() -> rx.Component:
+    return rx.cond(
+        BookState.import_status,
+        rx.el.div(
+            rx.el.p(BookState.import_status, class_name="font-medium text-gray-800"),
+            rx.foreach(
+                BookState.import_errors,
+                lambda error: rx.el.p(error, class_name="text-sm text-red-600"),
+            ),
+            class_name="p-4 mb-6 bg-white rounded-xl border border-gray-100 shadow-sm",
+        ),
+        None,
+    )
+
+
 def manage_books_content() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h1("Manage Books", class_name="text-2xl font-bold text-gray-900"),
-            rx.el.button(
-                rx.icon("plus", class_name="h-4 w-4 mr-2"),
-                "Add New Book",
-                on_click=BookState.open_add_book_modal,
-                class_name="flex items-center bg-blue-600 text-white px-4 py-2 rounded-lg font-semibold text-sm hover:bg-blue-700 transition",
+            rx.el.div(
+                bulk_import(),
+                rx.el.button(
+                    rx.icon("plus", class_name="h-4 w-4 mr-2"),
+                    "Add New Book",
+                    on_click=BookState.open_add_book_modal,
+                    class_name="flex items-center bg-blue-600 text-white px-4 py-2 rounded-lg font-semibold text-sm hover:bg-blue-700 transition",
+                ),
+                class_name="flex items-center gap-2",
             ),
             class_name="flex justify-between items-center mb-6",
         ),
+        import_report(),
+        manage_filters(),
         rx.el.div(
             rx.el.table(
                 rx.el.thead(
@@ -66,33 +206,22 @@ def manage_books_content() -> rx.Component:
                             "Cover",
                             class_name="text-left p-3 font-semibold text-gray-600",
                         ),
-                        rx.el.th(
-                            "Title",
-                            class_name="text-left p-3 font-semibold text-gray-600",
-                        ),
-                        rx.el.th(
-                            "Author",
-                            class_name="text-left p-3 font-semibold text-gray-600",
-                        ),
-                        rx.el.th(
-                            "Category",
-                            class_name="text-left p-3 font-semibold text-gray-600",
-                        ),
-                        rx.el.th(
-                            "Status",
-                            class_name="text-left p-3 font-semibold text-gray-600",
-                        ),
+                        sortable_header("Title", "title"),
+                        sortable_header("Author", "author"),
+                        sortable_header("Category", "category"),
+                        sortable_header("Status", "status"),
                         rx.el.th(
                             "Actions",
                             class_name="text-left p-3 font-semibold text-gray-600",
                         ),
                     )
                 ),
-                rx.el.tbody(rx.foreach(BookState.books, book_manage_row)),
+                rx.el.tbody(rx.foreach(BookState.manage_books, book_manage_row)),
                 class_name="w-full table-auto text-sm",
             ),
             class_name="w-full overflow-x-auto bg-white rounded-xl border border-gray-100 shadow-sm",
         ),
+        manage_pagination(),
         add_book_modal(),
         edit_book_modal(),
         class_name="w-full bg-gradient-to-br from-gray-50 to-slate-100",
@@ -25,6 +25,10 @@ def user_row(user: User) -> rx.Component:
             BookState.user_borrowed_counts.get(user["username"], 0).to_string(),
             class_name="p-4 font-medium",
         ),
+        rx.el.td(
+            BookState.user_fine_balances.get(user["username"], "$0.00"),
+            class_name="p-4 font-medium",
+        ),
         rx.el.td(
             rx.el.button(
                 "View Activity", class_name="text-blue-600 font-semibold text-sm"
@@ -34,6 +38,35 @@ def user_row(user: User) -> rx.Component:
     )
 
 
+def users_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.p(
+            f"{AuthState.total_users} users",
+            class_name="text-sm text-gray-600",
+        ),
+        rx.el.div(
+            rx.el.button(
+                "Previous",
+                on_click=AuthState.prev_users_page,
+                disabled=AuthState.users_page <= 1,
+                class_name="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
+            ),
+            rx.el.span(
+                f"Page {AuthState.users_page} of {AuthState.total_user_pages}",
+                class_name="text-sm text-gray-700 font-medium",
+            ),
+            rx.el.button(
+                "Next",
+                on_click=AuthState.next_users_page,
+                disabled=AuthState.users_page >= AuthState.total_user_pages,
+                class_name="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed",
+            ),
+            class_name="flex items-center gap-4",
+        ),
+        class_name="flex justify-between items-center mt-4",
+    )
+
+
 def users_content() -> rx.Component:
     return rx.el.div(
         rx.el.h1("User Management", class_name="text-2xl font-bold text-gray-900 mb-6"),
@@ -53,6 +86,10 @@ def users_content() -> rx.Component:
                             "Borrowed Books",
                             class_name="text-left p-4 font-semibold text-gray-600",
                         ),
+                        rx.el.th(
+                            "Fines",
+                            class_name="text-left p-4 font-semibold text-gray-600",
+                        ),
                         rx.el.th(
                             "Actions",
                             class_name="text-left p-4 font-semibold text-gray-600",
@@ -64,11 +101,12 @@ def users_content() -> rx.Component:
             ),
             class_name="w-full overflow-x-auto bg-white rounded-xl border border-gray-100 shadow-sm",
         ),
+        users_pagination(),
         class_name="w-full bg-gradient-to-br from-sky-50 to-blue-100",
     )
 
 
-@rx.page(on_load=[AuthState.check_login])
+@rx.page(on_load=[AuthState.check_login, BookState.refresh_catalog])
 def users_page() -> rx.Component:
     return rx.el.div(
         rx.cond(
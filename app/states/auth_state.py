@@ -1,93 +1,97 @@
 import reflex as rx
 from typing import Literal, TypedDict
+from app.store.users import UserRecord, get_user_directory
 
 Role = Literal["Student", "Librarian", "Teacher"]
+USERS_PAGE_SIZE = 25
 
 
 class User(TypedDict):
     username: str
-    password: str
     name: str
     role: Role
 
 
+def _public_user(record: UserRecord) -> User:
+    return User(username=record["username"], name=record["name"], role=record["role"])
+
+
 class AuthState(rx.State):
-    users: list[User] = [
-        {
-            "username": "librarian",
-            "password": "password",
-            "name": "Admin User",
-            "role": "Librarian",
-        },
-        {
-            "username": "student",
-            "password": "password",
-            "name": "John Doe",
-            "role": "Student",
-        },
-        {
-            "username": "teacher",
-            "password": "password",
-            "name": "Jane Smith",
-            "role": "Teacher",
-        },
-    ]
+    users_generation: int = 0
+    users_page: int = 1
     logged_in_user: User | None = None
     error_message: str = ""
     sidebar_open: bool = False
 
-    @rx.var
-    def is_logged_in(self) -> bool:
-        return self.logged_in_user is not None
+    def _sync_users(self):
+        generation = get_user_directory().generation
+        if self.users_generation != generation:
+            self.users_generation = generation
 
     @rx.var
     def is_logged_in(self) -> bool:
         return self.logged_in_user is not None
 
-    @rx.var
+    @rx.var(deps=["users_generation"])
+    def users(self) -> list[User]:
+        offset = (self.users_page - 1) * USERS_PAGE_SIZE
+        return [
+            _public_user(record)
+            for record in get_user_directory().page(offset, USERS_PAGE_SIZE)
+        ]
+
+    @rx.var(deps=["users_generation"])
     def total_users(self) -> int:
-        return len(self.users)
+        return len(get_user_directory())
+
+    @rx.var
+    def total_user_pages(self) -> int:
+        return max(1, -(-self.total_users // USERS_PAGE_SIZE))
+
+    @rx.event
+    def next_users_page(self):
+        self._sync_users()
+        if self.users_page < self.total_user_pages:
+            self.users_page += 1
+
+    @rx.event
+    def prev_users_page(self):
+        if self.users_page > 1:
+            self.users_page -= 1
 
     @rx.event
     def get_user_by_username(self, username: str) -> User | None:
-        for user in self.users:
-            if user["username"] == username:
-                return user
-        return None
+        record = get_user_directory().get(username)
+        return _public_user(record) if record else None
 
     @rx.var
     def current_user_role(self) -> Role | None:
         return self.logged_in_user["role"] if self.logged_in_user else None
 
     @rx.event
-    def register(self, form_data: dict):
+    async def register(self, form_data: dict):
         username = form_data["username"]
         password = form_data["password"]
         name = form_data["name"]
         role = form_data["role"]
-        if any((u["username"] == username for u in self.users)):
+        record = await get_user_directory().create_user(username, password, name, role)
+        if record is None:
             self.error_message = "Username already exists."
             return
-        new_user: User = {
-            "username": username,
-            "password": password,
-            "name": name,
-            "role": role,
-        }
-        self.users.append(new_user)
-        self.logged_in_user = new_user
+        self.logged_in_user = _public_user(record)
         self.error_message = ""
+        self._sync_users()
         return rx.redirect("/dashboard")
 
     @rx.event
-    def login(self, form_data: dict):
+    async def login(self, form_data: dict):
         username = form_data["username"]
         password = form_data["password"]
-        for user in self.users:
-            if user["username"] == username and user["password"] == password:
-                self.logged_in_user = user
-                self.error_message = ""
-                return rx.redirect("/dashboard")
+        record = await get_user_directory().authenticate(username, password)
+        if record is not None:
+            self.logged_in_user = _public_user(record)
+            self.error_message = ""
+            return rx.redirect("/dashboard")
         self.error_message = "Invalid username or password."
 
     @rx.event
@@ -98,9 +102,10 @@ class AuthState(rx.State):
 
     @rx.event
     def check_login(self):
+        self._sync_users()
         if not self.is_logged_in:
             return rx.redirect("/")
 
     @rx.event
     def toggle_sidebar(self):
-        self.sidebar_open = not self.sidebar_open
\ No newline at end of file
+        self.sidebar_open = not self.sidebar_open
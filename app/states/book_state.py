@@ -1,102 +1,45 @@
 import reflex as rx
-from typing import TypedDict, Literal
+import asyncio
 import datetime
+import io
 from app.states.auth_state import AuthState, User
-from app.data_generator import generate_books
-
-Category = Literal[
-    "Fiction",
-    "Dystopian",
-    "Science Fiction",
-    "Fantasy",
-    "Mystery",
-    "Non-Fiction",
-    "Science",
-    "History",
-    "Biography",
-    "Technology",
-    "Art",
-    "Philosophy",
-    "Romance",
-    "Thriller",
-    "Self-Help",
-    "Business",
-    "Children",
-    "Poetry",
-    "Drama",
-    "Travel",
-]
-
-
-class Book(TypedDict):
-    id: int
-    title: str
-    author: str
-    category: Category
-    cover_image_url: str
-    is_available: bool
-    description: str
-    isbn: str
-    publication_year: int
-
-
-class BorrowedBook(TypedDict):
-    book_id: int
-    user_username: str
-    due_date: str
-
-
-class BorrowedBookWithDetails(TypedDict):
-    book: Book
-    due_date: str
-
-
-class Reservation(TypedDict):
-    book_id: int
-    user_username: str
-    timestamp: str
-
-
-def get_initial_books() -> list[Book]:
-    all_books = generate_books(10000)
-    borrowed_ids = [3, 5, 9, 12, 15, 21, 28, 34, 42, 50, 61, 75, 88, 99, 101]
-    for book in all_books:
-        if book["id"] in borrowed_ids:
-            book["is_available"] = False
-    return all_books
-
-
-def get_initial_borrowed_books() -> list[BorrowedBook]:
-    return [
-        {
-            "book_id": 3,
-            "user_username": "student",
-            "due_date": (datetime.date.today() + datetime.timedelta(days=10)).strftime(
-                "%Y-%m-%d"
-            ),
-        },
-        {
-            "book_id": 5,
-            "user_username": "teacher",
-            "due_date": (datetime.date.today() + datetime.timedelta(days=25)).strftime(
-                "%Y-%m-%d"
-            ),
-        },
-        {
-            "book_id": 9,
-            "user_username": "student",
-            "due_date": (datetime.date.today() - datetime.timedelta(days=2)).strftime(
-                "%Y-%m-%d"
-            ),
-        },
-    ]
+from app.store.analytics import BookBorrowCount, CategoryCount, DailyLoanCount
+from app.store.catalog import get_catalog, ready_catalog
+from app.store.catalog_io import (
+    CATALOG_FORMATS,
+    catalog_format,
+    import_books,
+    validate_row,
+)
+from app.store.covers import get_cover_cache
+from app.store.fines import format_fine
+from app.store.models import (
+    Book,
+    BorrowedBook,
+    BorrowedBookWithDetails,
+    CatalogPage,
+    Category,
+    Reservation,
+)
+from app.store.notifications import get_notification_inbox
+from app.store.query_cache import QueryCacheStats
+from app.store.users import get_user_directory
+
+DUE_COUNTS_INTERVAL = datetime.timedelta(minutes=15)
+SEARCH_DEBOUNCE_SECONDS = 0.3
+TREND_INTERVAL = datetime.timedelta(minutes=15)
+MOST_BORROWED_LIMIT = 5
+EXPORT_URL = f"{rx.config.get_config().api_url}/export/books"
 
 
 class BookState(rx.State):
-    _all_books: list[Book] = get_initial_books()
-    books: list[Book] = _all_books
-    borrowed_books: list[BorrowedBook] = get_initial_borrowed_books()
-    reservations: list[Reservation] = []
+    catalog_generation: int = 0
+    books_generation: int = 0
+    loans_generation: int = 0
+    page_generation: int = 0
+    manage_generation: int = 0
+    user_loans_generation: int = 0
+    fines_generation: int = 0
     show_book_modal: bool = False
     show_edit_book_modal: bool = False
     show_add_book_modal: bool = False
@@ -106,71 +49,251 @@ class BookState(rx.State):
     availability_filter: str = "all"
     current_page: int = 1
     books_per_page: int = 20
+    manage_query: str = ""
+    manage_category_filter: str = "All"
+    manage_availability_filter: str = "all"
+    manage_sort_by: str = ""
+    manage_sort_desc: bool = False
+    manage_page: int = 1
+    manage_page_size: int = 25
+    _page_cursors: list[list] = [[]]
+    _manage_cursors: list[list] = [[]]
+    query_cache_stats: QueryCacheStats | None = None
+    import_status: str = ""
+    import_errors: list[str] = []
+    _pending_query: str = ""
+    _search_version: int = 0
+    _loans_owner: str = ""
+    _owner_loans_generation: int = 0
+
+    def _page_stale(
+        self,
+        result: CatalogPage,
+        availability: str,
+        sort_by: str,
+        changed: set[int] | None,
+    ) -> bool:
+        catalog = get_catalog()
+        if self.books_generation != catalog.books_generation:
+            return True
+        if self.loans_generation == catalog.loans_generation:
+            return False
+        if changed is None or availability != "all" or sort_by == "status":
+            return True
+        return any(book["id"] in changed for book in result["books"])
+
+    def _sync_catalog(self):
+        catalog = get_catalog()
+        catalog.sync()
+        changed = catalog.changed_since(self.catalog_generation)
+        if self.selected_book and (
+            changed is None or self.selected_book["id"] in changed
+        ):
+            self.selected_book = catalog.get(self.selected_book["id"])
+        if changed is None or changed:
+            if self._page_stale(
+                self.catalog_result, self.availability_filter, "", changed
+            ):
+                self.page_generation += 1
+            if self._page_stale(
+                self.manage_result,
+                self.manage_availability_filter,
+                self.manage_sort_by,
+                changed,
+            ):
+                self.manage_generation += 1
+        self.catalog_generation = catalog.generation
+        if self.books_generation != catalog.books_generation:
+            self.books_generation = catalog.books_generation
+        if self.loans_generation != catalog.loans_generation:
+            self.loans_generation = catalog.loans_generation
+        if self.fines_generation != catalog.fines_generation:
+            self.fines_generation = catalog.fines_generation
+        self._sync_user_loans()
+
+    def _sync_user_loans(self, username: str | None = None):
+        if username is not None and username != self._loans_owner:
+            self._loans_owner = username
+            self._owner_loans_generation = -1
+        generation = get_catalog().loans.user_generation(self._loans_owner)
+        if generation != self._owner_loans_generation:
+            self._owner_loans_generation = generation
+            self.user_loans_generation += 1
 
-    @rx.var
+    @rx.event
+    async def refresh_catalog(self):
+        await ready_catalog()
+        self._sync_catalog()
+
+    @rx.var(deps=["books_generation"])
     def total_books(self) -> int:
-        return len(self.books)
+        return len(get_catalog())
 
-    @rx.var
+    @rx.var(deps=["books_generation", "loans_generation"])
     def total_borrowed_books(self) -> int:
-        return len([book for book in self.books if not book["is_available"]])
+        return get_catalog().borrowed_count
 
     @rx.var
     def available_books_count(self) -> int:
         return self.total_books - self.total_borrowed_books
 
-    @rx.var
+    @rx.var(deps=["loans_generation"], interval=DUE_COUNTS_INTERVAL)
     def overdue_books_count(self) -> int:
-        today = datetime.date.today()
-        count = 0
-        for book in self.borrowed_books:
-            due_date = datetime.datetime.strptime(book["due_date"], "%Y-%m-%d").date()
-            if due_date < today:
-                count += 1
-        return count
+        return get_catalog().due_counts()[0]
 
     @rx.var
     def all_categories(self) -> list[str]:
-        return ["All"] + sorted(list(set((b["category"] for b in self._all_books))))
+        return ["All"] + self.all_book_categories
 
     @rx.var
-    def all_book_categories(self) -> list[str]:
-        return sorted(list(set((b["category"] for b in self._all_books))))
+    def query_cache_hit_rate(self) -> str:
+        if not self.query_cache_stats:
+            return "-"
+        stats = self.query_cache_stats
+        return f"{stats['hit_rate']:.0%} of {stats['hits'] + stats['misses']}"
 
-    @rx.var
-    def filtered_books(self) -> list[Book]:
-        books = self.books
-        if self.search_query:
-            query = self.search_query.lower()
-            books = [
-                b
-                for b in books
-                if query in b["title"].lower() or query in b["author"].lower()
-            ]
-        if self.category_filter != "All":
-            books = [b for b in books if b["category"] == self.category_filter]
-        if self.availability_filter != "all":
-            is_available = self.availability_filter == "available"
-            books = [b for b in books if b["is_available"] == is_available]
-        return books
+    @rx.var(deps=["books_generation"])
+    def all_book_categories(self) -> list[str]:
+        return get_catalog().facets.categories()
+
+    @rx.var(deps=["books_generation", "loans_generation"])
+    def category_options(self) -> list[list[str]]:
+        counts = get_catalog().facets.category_counts(self.availability_filter)
+        options = [["All", f"All ({sum(counts.values())})"]]
+        options.extend([cat, f"{cat} ({counts[cat]})"] for cat in sorted(counts))
+        return options
+
+    @rx.var(deps=["page_generation"], backend=True)
+    def catalog_result(self) -> CatalogPage:
+        return get_catalog().page(
+            self.search_query,
+            self.category_filter,
+            self.availability_filter,
+            after=self._page_cursors[self.current_page - 1] or None,
+            limit=self.books_per_page,
+        )
 
     @rx.var
     def total_pages(self) -> int:
-        return -(-len(self.filtered_books) // self.books_per_page)
+        return -(-self.catalog_result["total"] // self.books_per_page)
 
     @rx.var
     def paginated_books(self) -> list[Book]:
-        start = (self.current_page - 1) * self.books_per_page
-        end = start + self.books_per_page
-        return self.filtered_books[start:end]
+        return self.catalog_result["books"]
+
+    @rx.var(deps=["manage_generation"], backend=True)
+    def manage_result(self) -> CatalogPage:
+        return get_catalog().page(
+            self.manage_query,
+            self.manage_category_filter,
+            self.manage_availability_filter,
+            self.manage_sort_by,
+            self.manage_sort_desc,
+            self._manage_cursors[self.manage_page - 1] or None,
+            self.manage_page_size,
+        )
+
+    @rx.var
+    def manage_books(self) -> list[Book]:
+        return self.manage_result["books"]
+
+    @rx.var
+    def manage_total_books(self) -> int:
+        return self.manage_result["total"]
+
+    @rx.var
+    def manage_total_pages(self) -> int:
+        return max(-(-self.manage_result["total"] // self.manage_page_size), 1)
+
+    def _reset_manage_page(self):
+        self.manage_page = 1
+        self._manage_cursors = [[]]
+
+    @rx.event
+    def set_manage_query(self, query: str):
+        self.manage_query = query
+        self._reset_manage_page()
+
+    @rx.event
+    def set_manage_category_filter(self, category: str):
+        self.manage_category_filter = category
+        self._reset_manage_page()
+
+    @rx.event
+    def set_manage_availability_filter(self, availability: str):
+        self.manage_availability_filter = availability
+        self._reset_manage_page()
+
+    @rx.event
+    def set_manage_page_size(self, page_size: str):
+        self.manage_page_size = int(page_size)
+        self._reset_manage_page()
+
+    @rx.event
+    def sort_manage_by(self, column: str):
+        if self.manage_sort_by == column:
+            self.manage_sort_desc = not self.manage_sort_desc
+        else:
+            self.manage_sort_by = column
+            self.manage_sort_desc = False
+        self._reset_manage_page()
+
+    @rx.event
+    def manage_next_page(self):
+        next_cursor = self.manage_result["next_cursor"]
+        if next_cursor and self.manage_page < self.manage_total_pages:
+            self._manage_cursors = self._manage_cursors[: self.manage_page] + [
+                next_cursor
+            ]
+            self.manage_page += 1
+
+    @rx.event
+    def manage_prev_page(self):
+        if self.manage_page > 1:
+            self.manage_page -= 1
+
+    def _reset_catalog_page(self):
+        self.current_page = 1
+        self._page_cursors = [[]]
+
+    @rx.event
+    def set_search_query(self, query: str):
+        self._pending_query = query
+        self._search_version += 1
+        return BookState.apply_search_query(self._search_version)
+
+    @rx.event(background=True)
+    async def apply_search_query(self, version: int):
+        await asyncio.sleep(SEARCH_DEBOUNCE_SECONDS)
+        async with self:
+            if version != self._search_version:
+                return
+            if self._pending_query != self.search_query:
+                self.search_query = self._pending_query
+                self._reset_catalog_page()
+
+    @rx.event
+    def set_category_filter(self, category: str):
+        self.category_filter = category
+        self._reset_catalog_page()
+
+    @rx.event
+    def set_availability_filter(self, availability: str):
+        self.availability_filter = availability
+        self._reset_catalog_page()
 
     @rx.event
     def go_to_page(self, page_num: int):
-        self.current_page = page_num
+        if 1 <= page_num <= len(self._page_cursors):
+            self.current_page = page_num
 
     @rx.event
     def next_page(self):
-        if self.current_page < self.total_pages:
+        next_cursor = self.catalog_result["next_cursor"]
+        if next_cursor and self.current_page < self.total_pages:
+            self._page_cursors = self._page_cursors[: self.current_page] + [
+                next_cursor
+            ]
             self.current_page += 1
 
     @rx.event
@@ -178,29 +301,16 @@ class BookState(rx.State):
         if self.current_page > 1:
             self.current_page -= 1
 
-    @rx.var
+    @rx.var(deps=["loans_generation"], interval=DUE_COUNTS_INTERVAL)
     def books_due_soon_count(self) -> int:
-        count = 0
-        today = datetime.date.today()
-        for b in self.borrowed_books:
-            due = datetime.datetime.strptime(b["due_date"], "%Y-%m-%d").date()
-            if today < due <= today + datetime.timedelta(days=3):
-                count += 1
-        return count
+        return get_catalog().due_counts()[1]
 
-    @rx.var
+    @rx.var(deps=["user_loans_generation"])
     async def current_user_borrowed_books(self) -> list[BorrowedBook]:
         auth_state = await self.get_state(AuthState)
         if not auth_state or not auth_state.logged_in_user:
             return []
-        username = auth_state.logged_in_user["username"]
-        return [b for b in self.borrowed_books if b["user_username"] == username]
-
-    def _get_book_by_id(self, book_id: int) -> Book | None:
-        for book in self.books:
-            if book["id"] == book_id:
-                return book
-        return None
+        return get_catalog().loans.for_user(auth_state.logged_in_user["username"])
 
     @rx.var
     async def current_user_borrowed_books_with_details(
@@ -209,27 +319,92 @@ class BookState(rx.State):
         borrowed = await self.current_user_borrowed_books
         books_with_details = []
         for b in borrowed:
-            book_details = self._get_book_by_id(b["book_id"])
+            book_details = get_catalog().get(b["book_id"])
             if book_details:
                 books_with_details.append(
                     BorrowedBookWithDetails(book=book_details, due_date=b["due_date"])
                 )
         return books_with_details
 
-    @rx.var
+    @rx.var(deps=["catalog_generation"])
     def get_book_reservations(self) -> list[Reservation]:
         if not self.selected_book:
             return []
+        return get_catalog().reservations.for_book(self.selected_book["id"])
+
+    @rx.var(deps=["loans_generation"])
+    async def user_borrowed_counts(self) -> dict[str, int]:
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            return {}
+        loans = get_catalog().loans
+        return {
+            user["username"]: loans.count_for_user(user["username"])
+            for user in auth_state.users
+        }
+
+    @rx.var(deps=["loans_generation", "books_generation"])
+    def most_borrowed_books(self) -> list[BookBorrowCount]:
+        catalog = get_catalog()
+        most_borrowed = []
+        for book_id, count in catalog.analytics.top_books():
+            book = catalog.get(book_id)
+            if book:
+                most_borrowed.append(
+                    BookBorrowCount(
+                        book_id=book_id,
+                        title=book["title"],
+                        author=book["author"],
+                        count=count,
+                    )
+                )
+        return most_borrowed[:MOST_BORROWED_LIMIT]
+
+    @rx.var(deps=["loans_generation"])
+    def category_popularity(self) -> list[CategoryCount]:
+        analytics = get_catalog().analytics
+        counts = analytics.category_counts()
+        total = max(analytics.total_borrows, 1)
         return [
-            r for r in self.reservations if r["book_id"] == self.selected_book["id"]
+            CategoryCount(category=category, count=count, percent=count * 100 // total)
+            for category, count in sorted(counts.items(), key=lambda c: -c[1])
         ]
 
-    @rx.var
-    def user_borrowed_counts(self) -> dict[str, int]:
-        counts = {}
-        for user in self.borrowed_books:
-            counts[user["user_username"]] = counts.get(user["user_username"], 0) + 1
-        return counts
+    @rx.var(deps=["loans_generation"], interval=TREND_INTERVAL)
+    def borrowing_trend(self) -> list[DailyLoanCount]:
+        return get_catalog().analytics.daily_counts(datetime.date.today())
+
+    @rx.var(deps=["fines_generation", "user_loans_generation"])
+    async def current_user_fines(self) -> str:
+        auth_state = await self.get_state(AuthState)
+        if not auth_state or not auth_state.logged_in_user:
+            return format_fine(0)
+        username = auth_state.logged_in_user["username"]
+        return format_fine(get_catalog().fines.balance(username))
+
+    @rx.var(deps=["fines_generation"])
+    def outstanding_fines(self) -> str:
+        return format_fine(get_catalog().fines.total)
+
+    @rx.var(deps=["fines_generation"])
+    async def user_fine_balances(self) -> dict[str, str]:
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            return {}
+        fines = get_catalog().fines
+        return {
+            user["username"]: format_fine(fines.balance(user["username"]))
+            for user in auth_state.users
+        }
+
+    @rx.event
+    async def accrue_fines(self):
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            return rx.toast.error("Only librarians can run fine accrual.")
+        charged = (await ready_catalog()).accrue_fines()
+        self._sync_catalog()
+        return rx.toast.info(f"Accrued fines on {len(charged)} overdue loans.")
 
     @rx.event
     async def on_dashboard_load(self):
@@ -237,14 +412,21 @@ class BookState(rx.State):
         if not auth.is_logged_in:
             yield rx.redirect("/")
             return
-        for b in await self.current_user_borrowed_books:
-            due = datetime.datetime.strptime(b["due_date"], "%Y-%m-%d").date()
-            if due < datetime.date.today():
-                book = self._get_book_by_id(b["book_id"])
-                if book:
-                    yield rx.toast.warning(
-                        f"'{book['title']}' is overdue!", duration=5000
-                    )
+        catalog = await ready_catalog()
+        self._sync_catalog()
+        self._sync_user_loans(auth.logged_in_user["username"])
+        if auth.current_user_role == "Librarian":
+            self.query_cache_stats = catalog.query_cache.stats()
+        username = auth.logged_in_user["username"]
+        inbox = get_notification_inbox()
+        unread = inbox.unread(username)
+        if unread:
+            inbox.mark_read(username, unread[-1]["id"])
+        for notification in unread:
+            if notification["kind"] == "overdue":
+                yield rx.toast.warning(notification["message"], duration=5000)
+            else:
+                yield rx.toast.info(notification["message"], duration=5000)
 
     @rx.event
     async def borrow_book(self, book_id: int):
@@ -252,81 +434,48 @@ class BookState(rx.State):
         if not auth_state.is_logged_in:
             return rx.toast.error("You must be logged in to borrow a book.")
         user: User = auth_state.logged_in_user
-        book_to_borrow = self._get_book_by_id(book_id)
-        if book_to_borrow and book_to_borrow["is_available"]:
-            book_to_borrow["is_available"] = False
-            days = 30 if user["role"] == "Teacher" else 14
-            due_date = datetime.date.today() + datetime.timedelta(days=days)
-            new_borrowed_book: BorrowedBook = {
-                "book_id": book_id,
-                "user_username": user["username"],
-                "due_date": due_date.strftime("%Y-%m-%d"),
-            }
-            self.borrowed_books.append(new_borrowed_book)
-            self._update_book_in_list(book_to_borrow)
-            return rx.toast.success(
-                f"Successfully borrowed '{book_to_borrow['title']}'!"
-            )
+        catalog = await ready_catalog()
+        days = 30 if user["role"] == "Teacher" else 14
+        due_date = datetime.date.today() + datetime.timedelta(days=days)
+        borrowed = catalog.borrow(book_id, user["username"], due_date)
+        self._sync_user_loans(user["username"])
+        self._sync_catalog()
+        if borrowed:
+            book = catalog.get(book_id)
+            return rx.toast.success(f"Successfully borrowed '{book['title']}'!")
         return rx.toast.error("Book is not available for borrowing.")
 
     @rx.event
-    def return_book(self, book_id: int):
-        book_to_return = self._get_book_by_id(book_id)
-        if book_to_return:
-            book_to_return["is_available"] = True
-            self._update_book_in_list(book_to_return)
-        self.borrowed_books = [
-            b for b in self.borrowed_books if b["book_id"] != book_id
-        ]
+    async def return_book(self, book_id: int):
+        catalog = await ready_catalog()
+        book_to_return = catalog.return_book(book_id)
+        reservation = catalog.release_reservation(book_id)
+        if reservation and book_to_return:
+            get_notification_inbox().notify_reserved(reservation, book_to_return)
+        self._sync_catalog()
         if book_to_return:
             yield rx.toast.info(f"You have returned '{book_to_return['title']}'.")
 
-    def _update_book_in_list(self, updated_book: Book):
-        self.books = [
-            b if b["id"] != updated_book["id"] else updated_book for b in self.books
-        ]
-        self._all_books = [
-            b if b["id"] != updated_book["id"] else updated_book
-            for b in self._all_books
-        ]
-
     @rx.event
     async def reserve_book(self, book_id: int):
         auth_state = await self.get_state(AuthState)
         if not auth_state.is_logged_in:
             return rx.toast.error("You must be logged in to reserve a book.")
         user: User = auth_state.logged_in_user
-        book = self._get_book_by_id(book_id)
+        catalog = await ready_catalog()
+        book = catalog.get(book_id)
         if not book or book["is_available"]:
             return rx.toast.error("Book is available and cannot be reserved.")
-        if any(
-            (
-                r
-                for r in self.reservations
-                if r["book_id"] == book_id and r["user_username"] == user["username"]
-            )
-        ):
+        if catalog.reservations.has(book_id, user["username"]):
             return rx.toast.info("You have already reserved this book.")
         new_reservation = Reservation(
             book_id=book_id,
             user_username=user["username"],
             timestamp=datetime.datetime.now().isoformat(),
         )
-        if user["role"] == "Teacher":
-            insert_pos = 0
-            for i, res in enumerate(self.reservations):
-                res_user = await auth_state.get_user_by_username(res["user_username"])
-                if (
-                    res["book_id"] == book_id
-                    and res_user
-                    and (res_user["role"] != "Teacher")
-                ):
-                    insert_pos = i
-                    break
-                insert_pos = i + 1
-            self.reservations.insert(insert_pos, new_reservation)
-        else:
-            self.reservations.append(new_reservation)
+        if not catalog.add_reservation(new_reservation, user["role"]):
+            return rx.toast.info("You have already reserved this book.")
+        self._sync_catalog()
         return rx.toast.success(f"You have reserved '{book['title']}'.")
 
     @rx.event
@@ -359,55 +508,100 @@ class BookState(rx.State):
         self.selected_book = None
 
     @rx.event
-    def add_book(self, form_data: dict):
-        new_id = max((b["id"] for b in self._all_books), default=0) + 1
-        new_book: Book = {
-            "id": new_id,
-            "title": form_data["title"],
-            "author": form_data["author"],
-            "category": form_data["category"],
-            "cover_image_url": form_data.get("cover_image_url") or "/placeholder.svg",
-            "description": form_data["description"],
-            "is_available": True,
-            "isbn": form_data.get("isbn", ""),
-            "publication_year": int(form_data.get("publication_year", 2024)),
-        }
-        self._all_books.insert(0, new_book)
-        self.books = self._all_books
+    async def add_book(self, form_data: dict):
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            return rx.toast.error("Only librarians can add books.")
+        try:
+            new_book = validate_row(form_data)
+        except ValueError as e:
+            return rx.toast.error(f"Could not add book: {e}.")
+        (await ready_catalog()).add_book(new_book)
+        self._sync_catalog()
         self.show_add_book_modal = False
         return rx.toast.success(f"Added '{new_book['title']}'.")
 
     @rx.event
-    def update_book(self, form_data: dict):
+    async def export_catalog(self, fmt: str):
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            return rx.toast.error("Only librarians can export the catalog.")
+        if fmt not in CATALOG_FORMATS:
+            return rx.toast.error(f"Unknown export format '{fmt}'.")
+        username = auth_state.logged_in_user["username"]
+        token = get_user_directory().download_token(username)
+        return rx.download(
+            url=rx.Var.create(f"{EXPORT_URL}.{fmt}?token={token}"),
+            filename=f"books.{fmt}",
+        )
+
+    @rx.event
+    async def import_catalog(self, files: list[rx.UploadFile]):
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            yield rx.toast.error("Only librarians can import books.")
+            return
+        self.import_errors = []
+        catalog = await ready_catalog()
+        for file in files:
+            name = file.name or ""
+            fmt = catalog_format(name)
+            if fmt is None:
+                yield rx.toast.error(f"'{name}' is not a CSV or JSONL file.")
+                continue
+            stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+            for result in import_books(catalog, stream, fmt):
+                self.import_status = (
+                    f"Importing {name}: {result['imported']:,} books added"
+                )
+                yield
+            self.import_errors.extend(result["errors"])
+            self.import_status = (
+                f"Imported {result['imported']:,} books from {name}, "
+                f"rejected {result['rejected']:,} rows."
+            )
+        self._reset_manage_page()
+        self._sync_catalog()
+
+    @rx.event
+    async def update_book(self, form_data: dict):
+        auth_state = await self.get_state(AuthState)
+        if auth_state.current_user_role != "Librarian":
+            return rx.toast.error("Only librarians can edit books.")
         if not self.selected_book:
             return rx.toast.error("No book selected for update.")
-        updated_book: Book = self.selected_book.copy()
-        updated_book["title"] = form_data["title"]
-        updated_book["author"] = form_data["author"]
-        updated_book["category"] = form_data["category"]
-        updated_book["cover_image_url"] = (
-            form_data.get("cover_image_url") or self.selected_book["cover_image_url"]
-        )
-        updated_book["description"] = form_data["description"]
-        updated_book["isbn"] = form_data.get("isbn") or self.selected_book["isbn"]
-        updated_book["publication_year"] = (
-            int(form_data.get("publication_year"))
-            or self.selected_book["publication_year"]
-        )
-        self._update_book_in_list(updated_book)
+        row = {
+            **form_data,
+            "cover_image_url": form_data.get("cover_image_url")
+            or self.selected_book["cover_image_url"],
+            "isbn": form_data.get("isbn") or self.selected_book["isbn"],
+            "publication_year": form_data.get("publication_year")
+            or self.selected_book["publication_year"],
+        }
+        try:
+            updated_book = {**validate_row(row), "id": self.selected_book["id"]}
+        except ValueError as e:
+            return rx.toast.error(f"Could not update book: {e}.")
+        (await ready_catalog()).update_book(updated_book)
+        if (
+            updated_book["isbn"] != self.selected_book["isbn"]
+            or updated_book["cover_image_url"] != self.selected_book["cover_image_url"]
+        ):
+            get_cover_cache().invalidate(self.selected_book["isbn"])
+            get_cover_cache().invalidate(updated_book["isbn"])
+        self._sync_catalog()
         self.show_edit_book_modal = False
         self.selected_book = None
         return rx.toast.success(f"Updated '{updated_book['title']}'.")
 
     @rx.event
-    def delete_book(self, book_id: int):
-        if any((b for b in self.borrowed_books if b["book_id"] == book_id)):
+    async def delete_book(self, book_id: int):
+        catalog = await ready_catalog()
+        if catalog.is_borrowed(book_id):
             return rx.toast.error("Cannot delete a book that is currently borrowed.")
-        book_to_delete = self._get_book_by_id(book_id)
+        book_to_delete = catalog.delete_book(book_id)
         title = book_to_delete["title"] if book_to_delete else "Book"
-        self.books = [b for b in self.books if b["id"] != book_id]
-        self._all_books = [b for b in self._all_books if b["id"] != book_id]
-        self.reservations = [r for r in self.reservations if r["book_id"] != book_id]
+        self._sync_catalog()
         self.show_book_modal = False
         self.selected_book = None
         return rx.toast.info(f"Deleted '{title}'.")
\ No newline at end of file
@@ -1,22 +1,52 @@
 import reflex as rx
-import os
-import logging
+from app.store.source_files import VIEW_WINDOW_LINES, get_source_tree
 
 
 class CodeViewState(rx.State):
     file_paths: list[str] = []
     selected_file: str = ""
+    content_version: int = 0
+    total_lines: int = 0
+    windowed: bool = False
+    window_start: int = 0
+    window_lines: int = VIEW_WINDOW_LINES
+    _selected_stamp: list = []
 
-    @rx.var
+    def _check_selected(self):
+        tree = get_source_tree()
+        stamp = list(tree.stamp(self.selected_file) or [])
+        if stamp == self._selected_stamp:
+            return
+        if stamp[:1] != self._selected_stamp[:1]:
+            self.window_start = 0
+        self._selected_stamp = stamp
+        index = tree.line_index(self.selected_file) if stamp else None
+        self.total_lines = len(index) if index else 0
+        self.windowed = bool(stamp) and stamp[2] > tree.max_view_bytes
+        self.window_start = min(
+            self.window_start, max(self.total_lines - self.window_lines, 0)
+        )
+        self.content_version += 1
+
+    @rx.var(deps=["content_version"])
     def selected_file_content(self) -> str:
-        if not self.selected_file or not os.path.exists(self.selected_file):
+        if not self.selected_file:
             return "Select a file to view its content."
-        try:
-            with open(self.selected_file, "r") as f:
-                return f.read()
-        except Exception as e:
-            logging.exception(f"Error reading file: {e}")
-            return f"Error reading file: {e}"
+        tree = get_source_tree()
+        if self.windowed:
+            content = tree.read_lines(
+                self.selected_file, self.window_start, self.window_lines
+            )
+        else:
+            content = tree.read(self.selected_file)
+        if content is None:
+            return "Select a file to view its content."
+        return content
+
+    @rx.var
+    def window_label(self) -> str:
+        end = min(self.window_start + self.window_lines, self.total_lines)
+        return f"Lines {self.window_start + 1:,}-{end:,} of {self.total_lines:,}"
 
     @rx.var
     def language(self) -> str:
@@ -36,30 +66,33 @@ class CodeViewState(rx.State):
 
     @rx.event
     def select_file(self, file_path: str):
-        self.selected_file = file_path
+        if file_path in self.file_paths:
+            self.selected_file = file_path
+            self._check_selected()
 
     @rx.event
-    def load_files(self):
-        base_files = ["rxconfig.py", "requirements.txt", ".gitignore"]
+    def next_window(self):
+        if self.window_start + self.window_lines < self.total_lines:
+            self.window_start += self.window_lines
 
-        @rx.event
-        def get_files_in_dir(directory):
-            file_list = []
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    if (
-                        not file.endswith((".pyc", ".ico"))
-                        and "__pycache__" not in root
-                    ):
-                        file_path = os.path.join(root, file)
-                        if os.path.isfile(file_path):
-                            file_list.append(file_path)
-            return file_list
+    @rx.event
+    def prev_window(self):
+        self.window_start = max(self.window_start - self.window_lines, 0)
+
+    @rx.event
+    def go_to_line(self, form_data: dict):
+        try:
+            line = int(form_data.get("line", ""))
+        except ValueError:
+            return
+        line = min(max(line, 1), max(self.total_lines, 1))
+        self.window_start = (line - 1) // self.window_lines * self.window_lines
 
-        app_dirs = ["app"]
-        all_files = []
-        for app_dir in app_dirs:
-            all_files.extend(get_files_in_dir(app_dir))
-        self.file_paths = sorted([f for f in list(set(base_files + all_files))])
-        if not self.selected_file and self.file_paths:
-            self.selected_file = self.file_paths[0]
\ No newline at end of file
+    @rx.event
+    def load_files(self):
+        files = get_source_tree().files()
+        if files != self.file_paths:
+            self.file_paths = files
+        if self.selected_file not in self.file_paths:
+            self.selected_file = self.file_paths[0] if self.file_paths else ""
+        self._check_selected()
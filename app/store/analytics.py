@@ -0,0 +1,77 @@
+import datetime
+from typing import TypedDict
+from app.store.models import LoanEvent
+
+TOP_BOOKS = 10
+TREND_DAYS = 14
+
+
+class DailyLoanCount(TypedDict):
+    day: str
+    borrows: int
+    returns: int
+
+
+class BookBorrowCount(TypedDict):
+    book_id: int
+    title: str
+    author: str
+    count: int
+
+
+class CategoryCount(TypedDict):
+    category: str
+    count: int
+    percent: int
+
+
+class LoanAnalytics:
+    def __init__(self, events: list[LoanEvent] | None = None, top_k: int = TOP_BOOKS):
+        self.top_k = top_k
+        self.total_borrows = 0
+        self.total_returns = 0
+        self._daily: dict[str, list[int]] = {}
+        self._categories: dict[str, int] = {}
+        self._book_counts: dict[int, int] = {}
+        self._top: dict[int, int] = {}
+        for event in events or []:
+            self.record(event)
+
+    def record(self, event: LoanEvent):
+        daily = self._daily.setdefault(event["timestamp"][:10], [0, 0])
+        if event["kind"] == "return":
+            daily[1] += 1
+            self.total_returns += 1
+            return
+        daily[0] += 1
+        self.total_borrows += 1
+        category = event["category"]
+        self._categories[category] = self._categories.get(category, 0) + 1
+        book_id = event["book_id"]
+        count = self._book_counts[book_id] = self._book_counts.get(book_id, 0) + 1
+        self._count_top(book_id, count)
+
+    def _count_top(self, book_id: int, count: int):
+        if book_id in self._top or len(self._top) < self.top_k:
+            self._top[book_id] = count
+            return
+        weakest = min(self._top, key=self._top.__getitem__)
+        if count > self._top[weakest]:
+            del self._top[weakest]
+            self._top[book_id] = count
+
+    def top_books(self) -> list[tuple[int, int]]:
+        return sorted(self._top.items(), key=lambda item: (-item[1], item[0]))
+
+    def category_counts(self) -> dict[str, int]:
+        return dict(self._categories)
+
+    def daily_counts(
+        self, end: datetime.date, days: int = TREND_DAYS
+    ) -> list[DailyLoanCount]:
+        counts = []
+        for offset in range(days - 1, -1, -1):
+            day = (end - datetime.timedelta(days=offset)).isoformat()
+            borrows, returns = self._daily.get(day, (0, 0))
+            counts.append(DailyLoanCount(day=day, borrows=borrows, returns=returns))
+        return counts
@@ -0,0 +1,199 @@
+import array
+from app.store.models import Book
+
+DEFAULT_COVER_URL = "https://picsum.photos/seed/{isbn}/400/600"
+MAX_ISBN_BYTES = 2**16 - 1
+YEAR_RANGE = range(-(2**31), 2**31)
+
+
+class StringTable:
+    def __init__(self):
+        self._values: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, code: int) -> str:
+        return self._values[code]
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+
+class PackedStrings:
+    def __init__(self):
+        self._data = bytearray()
+        self._starts = array.array("Q")
+        self._lengths = array.array("H")
+
+    def __getitem__(self, row: int) -> str:
+        start = self._starts[row]
+        return self._data[start : start + self._lengths[row]].decode()
+
+    def append(self, encoded: bytes):
+        self._starts.append(0)
+        self._lengths.append(0)
+        self[len(self._starts) - 1] = encoded
+
+    def __setitem__(self, row: int, encoded: bytes):
+        self._starts[row] = len(self._data)
+        self._lengths[row] = len(encoded)
+        self._data += encoded
+
+
+def validate_book(book: Book) -> bytes:
+    isbn = book["isbn"].encode()
+    if len(isbn) > MAX_ISBN_BYTES:
+        raise ValueError(f"ISBN is longer than {MAX_ISBN_BYTES} bytes.")
+    year = book["publication_year"]
+    if year not in YEAR_RANGE:
+        raise ValueError(f"Publication year {year} is out of range.")
+    return isbn
+
+
+class BookTable:
+    def __init__(self):
+        self.categories = StringTable()
+        self._strings = StringTable()
+        self._rows = array.array("i", [0])
+        self._ids = array.array("i")
+        self._positions = array.array("q")
+        self._titles = array.array("I")
+        self._authors = array.array("I")
+        self._descriptions = array.array("I")
+        self._categories = array.array("H")
+        self._years = array.array("i")
+        self._available = bytearray()
+        self._isbns = PackedStrings()
+        self._covers: dict[int, str] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, book_id: int) -> bool:
+        return self._row(book_id) is not None
+
+    def _row(self, book_id: int) -> int | None:
+        if 0 < book_id < len(self._rows) and self._rows[book_id]:
+            return self._rows[book_id] - 1
+        return None
+
+    def next_id(self) -> int:
+        return len(self._rows)
+
+    def _encode(self, book: Book) -> tuple:
+        isbn = validate_book(book)
+        cover_image_url = book["cover_image_url"]
+        if cover_image_url == DEFAULT_COVER_URL.format(isbn=book["isbn"]):
+            cover_image_url = None
+        return (
+            self._strings.code(book["title"]),
+            self._strings.code(book["author"]),
+            self._strings.code(book["description"]),
+            self.categories.code(book["category"]),
+            book["publication_year"],
+            isbn,
+            cover_image_url,
+        )
+
+    def _set_fields(self, row: int, fields: tuple):
+        title, author, description, category, year, isbn, cover_image_url = fields
+        self._titles[row] = title
+        self._authors[row] = author
+        self._descriptions[row] = description
+        self._categories[row] = category
+        self._years[row] = year
+        self._isbns[row] = isbn
+        if cover_image_url is None:
+            self._covers.pop(row, None)
+        else:
+            self._covers[row] = cover_image_url
+
+    def append(self, book: Book, position: int):
+        book_id = book["id"]
+        if book_id in self:
+            raise ValueError(f"Book {book_id} is already in the table.")
+        fields = self._encode(book)
+        row = len(self._ids)
+        if book_id >= len(self._rows):
+            self._rows.extend([0] * (book_id + 1 - len(self._rows)))
+        self._rows[book_id] = row + 1
+        self._ids.append(book_id)
+        self._positions.append(position)
+        for column in (self._titles, self._authors, self._descriptions):
+            column.append(0)
+        self._categories.append(0)
+        self._years.append(0)
+        self._available.append(bool(book["is_available"]))
+        self._isbns.append(b"")
+        self._set_fields(row, fields)
+        self._count += 1
+
+    def update(self, book: Book) -> bool:
+        row = self._row(book["id"])
+        if row is None:
+            return False
+        self._set_fields(row, self._encode(book))
+        return True
+
+    def remove(self, book_id: int) -> bool:
+        row = self._row(book_id)
+        if row is None:
+            return False
+        self._rows[book_id] = 0
+        self._ids[row] = 0
+        self._covers.pop(row, None)
+        self._count -= 1
+        return True
+
+    def get(self, book_id: int) -> Book | None:
+        row = self._row(book_id)
+        if row is None:
+            return None
+        isbn = self._isbns[row]
+        cover_image_url = self._covers.get(row)
+        if cover_image_url is None:
+            cover_image_url = DEFAULT_COVER_URL.format(isbn=isbn)
+        return Book(
+            id=book_id,
+            title=self._strings[self._titles[row]],
+            author=self._strings[self._authors[row]],
+            category=self.categories[self._categories[row]],
+            cover_image_url=cover_image_url,
+            is_available=bool(self._available[row]),
+            description=self._strings[self._descriptions[row]],
+            isbn=isbn,
+            publication_year=self._years[row],
+        )
+
+    def value(self, book_id: int, field: str) -> str | int | bool:
+        row = self._rows[book_id] - 1
+        if field == "title":
+            return self._strings[self._titles[row]]
+        if field == "author":
+            return self._strings[self._authors[row]]
+        if field == "category":
+            return self.categories[self._categories[row]]
+        if field == "publication_year":
+            return self._years[row]
+        if field == "is_available":
+            return bool(self._available[row])
+        return self.get(book_id)[field]
+
+    def position(self, book_id: int) -> int:
+        return self._positions[self._rows[book_id] - 1]
+
+    def is_available(self, book_id: int) -> bool:
+        row = self._row(book_id)
+        return row is not None and bool(self._available[row])
+
+    def set_available(self, book_id: int, is_available: bool):
+        row = self._row(book_id)
+        if row is not None:
+            self._available[row] = is_available
@@ -0,0 +1,754 @@
+import array
+import asyncio
+import bisect
+import collections
+import contextlib
+import datetime
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from app.data_generator import generate_books
+from app.store.analytics import LoanAnalytics
+from app.store.book_table import BookTable, validate_book
+from app.store.db import LibraryDatabase, get_database
+from app.store.facets import FacetIndex
+from app.store.fines import FineLedger
+from app.store.loans import LoanLedger
+from app.store.models import (
+    Book,
+    BorrowedBook,
+    CatalogPage,
+    LoanEvent,
+    Reservation,
+)
+from app.store.query_cache import QueryCache
+from app.store.reservations import ReservationQueues
+from app.store.search_index import SearchIndex, query_tokens
+from app.store.snapshot import (
+    encode_snapshot,
+    load_snapshot,
+    save_snapshot,
+    write_snapshot,
+)
+from app.store.users import get_user_directory
+
+INITIAL_BORROWED_IDS = {3, 5, 9, 12, 15, 21, 28, 34, 42, 50, 61, 75, 88, 99, 101}
+CHANGELOG_SIZE = 1024
+FINE_ACCRUAL_DELAY_SECONDS = 60
+SYNC_INTERVAL_SECONDS = 5
+SORT_FIELDS = {
+    "title": ("title", str.lower),
+    "author": ("author", str.lower),
+    "category": ("category", str),
+    "year": ("publication_year", int),
+    "status": ("is_available", bool),
+}
+
+
+def _user_role(username: str) -> str:
+    record = get_user_directory().get(username)
+    return record["role"] if record else ""
+
+
+def get_initial_books() -> list[Book]:
+    all_books = generate_books(10000)
+    for book in all_books:
+        if book["id"] in INITIAL_BORROWED_IDS:
+            book["is_available"] = False
+    return all_books
+
+
+def get_initial_borrowed_books() -> list[BorrowedBook]:
+    return [
+        {
+            "book_id": 3,
+            "user_username": "student",
+            "due_date": (datetime.date.today() + datetime.timedelta(days=10)).strftime(
+                "%Y-%m-%d"
+            ),
+        },
+        {
+            "book_id": 5,
+            "user_username": "teacher",
+            "due_date": (datetime.date.today() + datetime.timedelta(days=25)).strftime(
+                "%Y-%m-%d"
+            ),
+        },
+        {
+            "book_id": 9,
+            "user_username": "student",
+            "due_date": (datetime.date.today() - datetime.timedelta(days=2)).strftime(
+                "%Y-%m-%d"
+            ),
+        },
+    ]
+
+
+class LibraryCatalog:
+    def __init__(
+        self,
+        books: list[Book],
+        borrowed_books: list[BorrowedBook],
+        reservations: list[tuple[Reservation, str]] | None = None,
+        db: LibraryDatabase | None = None,
+        positions: list[int] | None = None,
+        loan_events: list[LoanEvent] | None = None,
+        fines: tuple[dict[str, int], dict[int, int], int, int] | None = None,
+    ):
+        self._db = db
+        self._table = BookTable()
+        self._order = array.array("i", [b["id"] for b in books])
+        for book, position in zip(books, positions or self._order):
+            self._table.append(book, position)
+        self._front_position = min(positions or self._order, default=1)
+        self.search_index = SearchIndex(books)
+        self.facets = FacetIndex(books)
+        self.loans = LoanLedger(borrowed_books)
+        self.analytics = LoanAnalytics(loan_events)
+        self.fines = FineLedger(*(fines or ()))
+        self.reservations = ReservationQueues()
+        for reservation, role in reservations or []:
+            self.reservations.add(reservation, role)
+        self.generation = 0
+        self.books_generation = 0
+        self.loans_generation = 0
+        self.fines_generation = 0
+        self._event_id = 0
+        self._sorted: dict[str, tuple[tuple[int, int], list[int]]] = {}
+        self.query_cache = QueryCache()
+        self._changes: collections.deque[tuple[int, int]] = collections.deque(
+            maxlen=CHANGELOG_SIZE
+        )
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_db"] = None
+        return state
+
+    def _bump(self, book_id: int):
+        self.generation += 1
+        self._changes.append((self.generation, book_id))
+
+    def sync(self) -> bool | None:
+        if self._db is None or self._db.synced_revision == self._db.revision():
+            return False
+        changes = self._db.changes_since(self._db.synced_revision)
+        if changes is None:
+            return None
+        revision, book_ids = changes
+        for book_id in sorted(book_ids):
+            self._reload_book(book_id)
+        if self._db.fines_revision() != self.fines.revision:
+            self._reload_fines()
+        self._sync_events()
+        self._db.synced_revision = revision
+        return bool(book_ids)
+
+    def _reload_book(self, book_id: int):
+        row = self._db.get_book(book_id)
+        book = row[0] if row else None
+        current = self._table.get(book_id)
+        if book is None:
+            if current is not None:
+                self._drop_book(current)
+        elif current is None:
+            self._insert_book(*row)
+        elif book != current:
+            self._replace_book(current, book)
+        loan = self._db.get_loan(book_id)
+        loan_changed = loan != self.loans.get(book_id)
+        if loan_changed:
+            self.loans.remove(book_id)
+            if loan is not None:
+                self.loans.add(loan)
+            self.loans_generation += 1
+        queue = self.reservations.for_book(book_id)
+        self.reservations.remove_book(book_id)
+        for reservation, role in self._db.load_reservations(book_id):
+            self.reservations.add(reservation, role)
+        if (
+            loan_changed
+            or book != current
+            or queue != self.reservations.for_book(book_id)
+        ):
+            self._bump(book_id)
+
+    def _reload_fines(self):
+        self.fines = FineLedger(*self._db.load_fines())
+        self.fines_generation += 1
+
+    def _sync_events(self):
+        for event_id, event in self._db.loan_events_since(self._event_id):
+            self.analytics.record(event)
+            self._event_id = event_id
+
+    def _record(self, event: LoanEvent):
+        if self._db is None:
+            self.analytics.record(event)
+        else:
+            self._sync_events()
+
+    def changed_since(self, generation: int) -> set[int] | None:
+        if generation >= self.generation:
+            return set()
+        if not self._changes or self._changes[0][0] > generation + 1:
+            return None
+        return {
+            book_id for changed_at, book_id in self._changes if changed_at > generation
+        }
+
+    @property
+    def borrowed_count(self) -> int:
+        return self.facets.borrowed_count
+
+    def due_counts(self, due_soon_days: int = 3) -> tuple[int, int]:
+        today = datetime.date.today()
+        return (
+            self.loans.count_due_before(today),
+            self.loans.count_due_between(
+                today + datetime.timedelta(days=1),
+                today + datetime.timedelta(days=due_soon_days),
+            ),
+        )
+
+    def get(self, book_id: int) -> Book | None:
+        return self._table.get(book_id)
+
+    def iter_books(self) -> Iterator[Book]:
+        for book_id in range(1, self._table.next_id()):
+            book = self._table.get(book_id)
+            if book is not None:
+                yield book
+
+    def _sort_key(self, sort_by: str):
+        position = self._table.position
+        if sort_by not in SORT_FIELDS:
+            return lambda book_id: (position(book_id),)
+        field, normalize = SORT_FIELDS[sort_by]
+        value = self._table.value
+        return lambda book_id: (normalize(value(book_id, field)), position(book_id))
+
+    def _cursor(self, book: Book, sort_by: str) -> list:
+        position = self._table.position(book["id"])
+        if sort_by not in SORT_FIELDS:
+            return [position]
+        return [book[SORT_FIELDS[sort_by][0]], position]
+
+    def _cursor_key(self, after: list, sort_by: str) -> tuple:
+        if sort_by not in SORT_FIELDS:
+            return (after[0],)
+        return (SORT_FIELDS[sort_by][1](after[0]), after[1])
+
+    def sorted_ids(self, sort_by: str) -> array.array:
+        if sort_by not in SORT_FIELDS:
+            return self._order
+        version = (
+            self.books_generation,
+            self.loans_generation if sort_by == "status" else 0,
+        )
+        cached = self._sorted.get(sort_by)
+        if cached is None or cached[0] != version:
+            cached = self._sorted[sort_by] = (
+                version,
+                array.array("i", sorted(self._order, key=self._sort_key(sort_by))),
+            )
+        return cached[1]
+
+    def _keyset(
+        self,
+        ids: list[int] | array.array,
+        key,
+        after: tuple | None,
+        descending: bool,
+        limit: int,
+        matches: Callable[[int], bool] | None = None,
+    ) -> list[int]:
+        if descending:
+            step = -1
+            start = len(ids) - 1
+            if after is not None:
+                start = bisect.bisect_left(ids, after, key=key) - 1
+        else:
+            step = 1
+            start = 0
+            if after is not None:
+                start = bisect.bisect_right(ids, after, key=key)
+        window = []
+        index = start
+        while 0 <= index < len(ids) and len(window) < limit:
+            if matches is None or matches(ids[index]):
+                window.append(ids[index])
+            index += step
+        return window
+
+    def page(
+        self,
+        query: str = "",
+        category: str = "All",
+        availability: str = "all",
+        sort_by: str = "",
+        descending: bool = False,
+        after: list | None = None,
+        limit: int = 20,
+    ) -> CatalogPage:
+        version = (self.books_generation, self.loans_generation)
+        query = " ".join(query_tokens(query))
+        key = (
+            query,
+            category,
+            availability,
+            sort_by if sort_by in SORT_FIELDS else "",
+            descending,
+            None if after is None else tuple(after),
+            limit,
+        )
+        result = self.query_cache.get(version, key)
+        if result is None:
+            result = self._query_page(
+                query, category, availability, sort_by, descending, after, limit
+            )
+            self.query_cache.put(version, key, result)
+        return result
+
+    def _query_page(
+        self,
+        query: str,
+        category: str,
+        availability: str,
+        sort_by: str,
+        descending: bool,
+        after: list | None,
+        limit: int,
+    ) -> CatalogPage:
+        if query:
+            ids = self.search_index.search(query)
+            matches = self.facets.match(category, availability)
+            if matches is not None:
+                ids = [book_id for book_id in ids if matches(book_id)]
+            if sort_by in SORT_FIELDS:
+                key = self._sort_key(sort_by)
+                ids.sort(key=key)
+                cursor_key = None if after is None else self._cursor_key(after, sort_by)
+            else:
+                ranks = {book_id: rank for rank, book_id in enumerate(ids)}
+                key = ranks.__getitem__
+                cursor_key = None if after is None else after[0]
+            window = self._keyset(ids, key, cursor_key, descending, limit)
+            books = [self._table.get(book_id) for book_id in window]
+            next_cursor = None
+            if len(window) == limit:
+                next_cursor = (
+                    self._cursor(books[-1], sort_by)
+                    if sort_by in SORT_FIELDS
+                    else [ranks[window[-1]]]
+                )
+            return CatalogPage(books=books, total=len(ids), next_cursor=next_cursor)
+        if self._db is not None:
+            books = self._db.query_books(
+                category, availability, sort_by, descending, after, limit
+            )
+        else:
+            window = self._keyset(
+                self.sorted_ids(sort_by),
+                self._sort_key(sort_by),
+                None if after is None else self._cursor_key(after, sort_by),
+                descending,
+                limit,
+                self.facets.match(category, availability),
+            )
+            books = [self._table.get(book_id) for book_id in window]
+        return CatalogPage(
+            books=books,
+            total=self.facets.count(category, availability),
+            next_cursor=(
+                self._cursor(books[-1], sort_by) if len(books) == limit else None
+            ),
+        )
+
+    def add_book(self, book: Book) -> Book:
+        return self.add_books([book])[0]
+
+    def _place_books(self, count: int) -> list[tuple[int, int]]:
+        first_id = self._table.next_id()
+        first_position = self._front_position - count
+        return [(first_id + offset, first_position + offset) for offset in range(count)]
+
+    def add_books(self, books: list[Book]) -> list[Book]:
+        if not books:
+            return books
+        for book in books:
+            validate_book(book)
+        if self._db is not None:
+            placed = self._db.add_books(books)
+        else:
+            placed = self._place_books(len(books))
+        for book, (book_id, position) in zip(books, placed):
+            book["id"] = book_id
+            self._table.append(book, position)
+            self.search_index.add(book)
+            self.facets.add(book)
+        self._order[0:0] = array.array("i", [book["id"] for book in books])
+        self._front_position = min(self._front_position, placed[0][1])
+        self.books_generation += 1
+        for book in books:
+            self._bump(book["id"])
+        return books
+
+    def _insert_book(self, book: Book, position: int):
+        self._table.append(book, position)
+        bisect.insort(self._order, book["id"], key=self._table.position)
+        self._front_position = min(self._front_position, position)
+        self.search_index.add(book)
+        self.facets.add(book)
+        self.books_generation += 1
+
+    def _replace_book(self, current: Book, book: Book):
+        self._table.update(book)
+        self._table.set_available(book["id"], book["is_available"])
+        self.search_index.update(current, book)
+        self.facets.update(current, book)
+        if {**current, "is_available": book["is_available"]} != book:
+            self.books_generation += 1
+        if current["is_available"] != book["is_available"]:
+            self.loans_generation += 1
+
+    def _drop_book(self, book: Book):
+        self._table.remove(book["id"])
+        self._order.remove(book["id"])
+        self.search_index.remove(book)
+        self.facets.remove(book)
+        self.reservations.remove_book(book["id"])
+        self.books_generation += 1
+
+    def update_book(self, book: Book) -> Book | None:
+        self.sync()
+        current = self._table.get(book["id"])
+        if current is None:
+            return None
+        book = {**book, "is_available": current["is_available"]}
+        validate_book(book)
+        if self._db is not None:
+            self._db.update_book(book)
+        self._replace_book(current, book)
+        self._bump(book["id"])
+        return book
+
+    def delete_book(self, book_id: int) -> Book | None:
+        self.sync()
+        book = self._table.get(book_id)
+        if book is None:
+            return None
+        if self._db is not None:
+            self._db.delete_book(book_id)
+        self._drop_book(book)
+        self._bump(book_id)
+        return book
+
+    def is_borrowed(self, book_id: int) -> bool:
+        return book_id in self.loans
+
+    def _loan_event(self, book_id: int, username: str, kind: str) -> LoanEvent:
+        return LoanEvent(
+            book_id=book_id,
+            user_username=username,
+            category=self._table.value(book_id, "category"),
+            kind=kind,
+            timestamp=datetime.datetime.now().isoformat(timespec="seconds"),
+        )
+
+    def borrow(self, book_id: int, username: str, due_date: datetime.date) -> bool:
+        self.sync()
+        if book_id not in self._table:
+            return False
+        if self._db is None and not self._table.is_available(book_id):
+            return False
+        loan = BorrowedBook(
+            book_id=book_id,
+            user_username=username,
+            due_date=due_date.strftime("%Y-%m-%d"),
+        )
+        event = self._loan_event(book_id, username, "borrow")
+        if self._db is not None and not self._db.save_loan(loan, event):
+            self.sync()
+            return False
+        self._record(event)
+        self._table.set_available(book_id, False)
+        self.facets.set_available(book_id, False)
+        self.loans.add(loan)
+        self.loans_generation += 1
+        self._bump(book_id)
+        return True
+
+    def return_book(self, book_id: int) -> Book | None:
+        self.sync()
+        self._table.set_available(book_id, True)
+        book = self._table.get(book_id)
+        loan = self.loans.get(book_id)
+        event = None
+        fine = None
+        if book and loan:
+            event = self._loan_event(book_id, loan["user_username"], "return")
+        if loan:
+            username = loan["user_username"]
+            previous = self.fines.balance(username)
+            amount = self.fines.settle(
+                loan, datetime.date.today(), _user_role(username)
+            )
+            fine = (username, amount) if amount else None
+            if self.fines.balance(username) != previous:
+                self.fines_generation += 1
+        if self._db is not None and self._db.delete_loan(book_id, event, fine):
+            self._reload_fines()
+        if event:
+            self._record(event)
+        if book:
+            self.facets.set_available(book_id, True)
+        if self.loans.remove(book_id) is not None or book:
+            self.loans_generation += 1
+            self._bump(book_id)
+        return book
+
+    def accrue_fines(self, day: datetime.date | None = None) -> list[BorrowedBook]:
+        self.sync()
+        charged = self.fines.accrue(
+            self.loans, day or datetime.date.today(), _user_role
+        )
+        if not charged:
+            return charged
+        if self._db is None:
+            self.fines_generation += 1
+            return charged
+        self._db.save_fines(
+            [
+                (
+                    loan["book_id"],
+                    loan["user_username"],
+                    self.fines.loan_fine(loan["book_id"]),
+                )
+                for loan in charged
+            ],
+            self.fines.accrued_through,
+        )
+        self._reload_fines()
+        return charged
+
+    def release_reservation(self, book_id: int) -> Reservation | None:
+        if not self._table.is_available(book_id):
+            return None
+        reservation = self.reservations.pop(book_id)
+        if reservation is None:
+            return None
+        if self._db is not None:
+            self._db.delete_reservation(book_id, reservation["user_username"])
+        self._bump(book_id)
+        return reservation
+
+    def add_reservation(self, reservation: Reservation, role: str) -> bool:
+        self.sync()
+        if not self.reservations.add(reservation, role):
+            return False
+        if self._db is not None:
+            self._db.save_reservation(reservation, role)
+        self._bump(reservation["book_id"])
+        return True
+
+_catalog: LibraryCatalog | None = None
+_catalog_lock = threading.Lock()
+_catalog_loading: asyncio.Future | None = None
+_empty_catalog = LibraryCatalog([], [])
+_snapshot_revision: int | None = None
+
+
+def _take_over(catalog: LibraryCatalog, previous: LibraryCatalog):
+    catalog.generation = max(catalog.generation, previous.generation) + 1
+    catalog.books_generation = (
+        max(catalog.books_generation, previous.books_generation) + 1
+    )
+    catalog.loans_generation = (
+        max(catalog.loans_generation, previous.loans_generation) + 1
+    )
+    catalog.fines_generation = (
+        max(catalog.fines_generation, previous.fines_generation) + 1
+    )
+
+
+def _load_catalog() -> LibraryCatalog:
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                started = time.perf_counter()
+                catalog = load_catalog(get_database())
+                _take_over(catalog, _empty_catalog)
+                _catalog = catalog
+                logging.info(
+                    f"Loaded catalog of {len(_catalog)} books in "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                )
+    return _catalog
+
+
+def _start_loading() -> asyncio.Future:
+    global _catalog_loading
+    if _catalog_loading is None or (_catalog_loading.done() and _catalog is None):
+        _catalog_loading = asyncio.ensure_future(asyncio.to_thread(_load_catalog))
+    return _catalog_loading
+
+
+def get_catalog() -> LibraryCatalog:
+    if _catalog is not None:
+        return _catalog
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _load_catalog()
+    _start_loading()
+    return _empty_catalog
+
+
+async def ready_catalog() -> LibraryCatalog:
+    if _catalog is None:
+        await asyncio.shield(_start_loading())
+    return _catalog
+
+
+def _encode_catalog_snapshot() -> bytes | None:
+    global _snapshot_revision
+    if _catalog is None or _catalog._db is None:
+        return None
+    revision = _catalog._db.synced_revision
+    if revision != _catalog._db.revision():
+        logging.info("Skipping catalog snapshot: the catalog is behind the database")
+        return None
+    if revision == _snapshot_revision:
+        return None
+    _snapshot_revision = revision
+    return encode_snapshot(_catalog, revision)
+
+
+def save_catalog_snapshot():
+    if _catalog is not None:
+        _catalog.sync()
+    data = _encode_catalog_snapshot()
+    if data is not None:
+        write_snapshot(data)
+
+
+def _load_fresh_catalog(path: str) -> tuple[LibraryCatalog, int]:
+    db = LibraryDatabase(path)
+    try:
+        revision = db.revision()
+        return _build_catalog(db), revision
+    finally:
+        db.close()
+
+
+async def _rebuild_catalog():
+    global _catalog
+    stale = get_catalog()
+    logging.info("Catalog fell behind the database change log, rebuilding it")
+    catalog, revision = await asyncio.to_thread(_load_fresh_catalog, stale._db.path)
+    catalog._db = stale._db
+    _take_over(catalog, stale)
+    catalog._db.synced_revision = revision
+    _catalog = catalog
+    catalog.sync()
+
+
+async def follow_database():
+    await ready_catalog()
+    while True:
+        await asyncio.sleep(SYNC_INTERVAL_SECONDS)
+        try:
+            if get_catalog().sync() is None:
+                await _rebuild_catalog()
+        except Exception as e:
+            logging.exception(f"Catalog sync failed: {e}")
+
+
+def _seconds_until_midnight() -> float:
+    midnight = datetime.datetime.combine(
+        datetime.date.today() + datetime.timedelta(days=1), datetime.time()
+    )
+    return (midnight - datetime.datetime.now()).total_seconds()
+
+
+async def accrue_fines_daily():
+    await ready_catalog()
+    while True:
+        try:
+            charged = get_catalog().accrue_fines()
+            logging.info(f"Accrued fines on {len(charged)} overdue loans")
+        except Exception as e:
+            logging.exception(f"Fine accrual failed: {e}")
+        await asyncio.sleep(_seconds_until_midnight() + FINE_ACCRUAL_DELAY_SECONDS)
+
+
+@contextlib.asynccontextmanager
+async def catalog_lifespan():
+    _start_loading()
+    tasks = [
+        asyncio.create_task(accrue_fines_daily()),
+        asyncio.create_task(follow_database()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    save_catalog_snapshot()
+
+
+def load_catalog(db: LibraryDatabase) -> LibraryCatalog:
+    global _snapshot_revision
+    revision = db.revision()
+    db.synced_revision = revision
+    catalog = load_snapshot(revision)
+    if catalog is not None:
+        catalog._db = db
+        _snapshot_revision = revision
+        return catalog
+    catalog = _build_catalog(db)
+    if db.synced_revision == db.revision():
+        save_snapshot(catalog, db.synced_revision)
+        _snapshot_revision = db.synced_revision
+    return catalog
+
+
+def _seed_database(db: LibraryDatabase):
+    books = get_initial_books()
+    borrowed_books = get_initial_borrowed_books()
+    categories = {book["id"]: book["category"] for book in books}
+    loan_events = [
+        LoanEvent(
+            book_id=loan["book_id"],
+            user_username=loan["user_username"],
+            category=categories[loan["book_id"]],
+            kind="borrow",
+            timestamp=datetime.datetime.now().isoformat(timespec="seconds"),
+        )
+        for loan in borrowed_books
+    ]
+    db.insert_books(books, [b["id"] for b in books])
+    db.insert_loans(borrowed_books)
+    db.insert_loan_events(loan_events)
+
+
+def _build_catalog(db: LibraryDatabase) -> LibraryCatalog:
+    if not db.has_books():
+        _seed_database(db)
+    books, positions = db.load_books()
+    events = db.loan_events_since(0)
+    catalog = LibraryCatalog(
+        books,
+        db.load_loans(),
+        db.load_reservations(),
+        db,
+        positions,
+        [event for _, event in events],
+        db.load_fines(),
+    )
+    catalog._event_id = events[-1][0] if events else 0
+    return catalog
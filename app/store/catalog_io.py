@@ -0,0 +1,136 @@
+import csv
+import datetime
+import io
+import json
+from collections.abc import Iterator
+from typing import IO, TypedDict, get_args
+from app.store.book_table import DEFAULT_COVER_URL
+from app.store.catalog import LibraryCatalog
+from app.store.covers import ISBN_PATTERN
+from app.store.models import Book, Category
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_ROWS = 1000
+MAX_IMPORT_ERRORS = 20
+PLACEHOLDER = "/placeholder.svg"
+CATALOG_FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+EXPORT_FIELDS = (
+    "id",
+    "title",
+    "author",
+    "category",
+    "isbn",
+    "publication_year",
+    "description",
+    "cover_image_url",
+    "is_available",
+)
+CATEGORIES = set(get_args(Category))
+
+
+class ImportResult(TypedDict):
+    imported: int
+    rejected: int
+    errors: list[str]
+
+
+def catalog_format(filename: str) -> str | None:
+    suffix = filename.rpartition(".")[2].lower()
+    return suffix if suffix in CATALOG_FORMATS else None
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[dict | str]:
+    if fmt == "csv":
+        return csv.DictReader(stream)
+    return (line for line in stream if line.strip())
+
+
+def _text(row: dict, field: str) -> str:
+    value = row.get(field)
+    return "" if value is None else str(value).strip()
+
+
+def validate_row(row: dict | str) -> Book:
+    if isinstance(row, str):
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError("expected a JSON object")
+    missing = [
+        field for field in ("title", "author", "category") if not _text(row, field)
+    ]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    category = _text(row, "category")
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category {category!r}")
+    isbn = _text(row, "isbn")
+    if isbn and not ISBN_PATTERN.fullmatch(isbn):
+        raise ValueError(f"invalid ISBN {isbn!r}")
+    try:
+        year = int(_text(row, "publication_year"))
+    except ValueError:
+        raise ValueError("publication_year must be a whole number") from None
+    if not 0 < year <= datetime.date.today().year + 1:
+        raise ValueError(f"publication_year {year} is out of range")
+    cover_image_url = _text(row, "cover_image_url")
+    if not cover_image_url:
+        cover_image_url = DEFAULT_COVER_URL.format(isbn=isbn) if isbn else PLACEHOLDER
+    return Book(
+        id=0,
+        title=_text(row, "title"),
+        author=_text(row, "author"),
+        category=category,
+        cover_image_url=cover_image_url,
+        is_available=True,
+        description=_text(row, "description"),
+        isbn=isbn,
+        publication_year=year,
+    )
+
+
+def import_books(
+    catalog: LibraryCatalog,
+    stream: IO[str],
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Iterator[ImportResult]:
+    result = ImportResult(imported=0, rejected=0, errors=[])
+    batch: list[Book] = []
+    number = 0
+    try:
+        for number, row in enumerate(read_rows(stream, fmt), 1):
+            try:
+                batch.append(validate_row(row))
+            except ValueError as e:
+                result["rejected"] += 1
+                if len(result["errors"]) < MAX_IMPORT_ERRORS:
+                    result["errors"].append(f"Row {number}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                result["imported"] += len(catalog.add_books(batch))
+                batch = []
+                yield result
+    except (csv.Error, UnicodeDecodeError) as e:
+        result["errors"].append(f"Stopped reading after row {number}: {e}")
+    if batch:
+        result["imported"] += len(catalog.add_books(batch))
+    yield result
+
+
+def export_books(
+    catalog: LibraryCatalog, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS
+) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_FIELDS)
+    if fmt == "csv":
+        writer.writeheader()
+    for count, book in enumerate(catalog.iter_books(), 1):
+        if fmt == "csv":
+            writer.writerow(book)
+        else:
+            buffer.write(json.dumps(book) + "\n")
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,198 @@
+import asyncio
+import contextlib
+import hashlib
+import io
+import ipaddress
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections.abc import Callable
+from typing import TypedDict
+from PIL import Image, ImageDraw, ImageOps
+from app.store.db import get_database
+
+COVER_DIR = os.environ.get("LIBSYS_COVER_DIR", ".covers")
+COVER_ORIGIN = os.environ.get("LIBSYS_COVER_ORIGIN", "")
+COVER_HOSTS = tuple(
+    host.strip().lower()
+    for host in os.environ.get("LIBSYS_COVER_HOSTS", "picsum.photos").split(",")
+    if host.strip()
+)
+THUMBNAIL_SIZES = {"row": (64, 96), "card": (256, 384), "detail": (400, 600)}
+WEBP_QUALITY = 80
+FETCH_TIMEOUT_SECONDS = 5
+MAX_COVER_BYTES = 5 * 1024 * 1024
+FAILURE_RETRY_SECONDS = 300
+ISBN_PATTERN = re.compile(r"[0-9Xx-]{1,32}")
+PLACEHOLDER_SVG = (
+    b'<svg xmlns="http://www.w3.org/2000/svg" width="400" height="600" '
+    b'viewBox="0 0 400 600"><rect width="400" height="600" fill="#e5e7eb"/>'
+    b'<path d="M150 220h100v160H150z" fill="none" stroke="#9ca3af" '
+    b'stroke-width="8"/><path d="M170 260h60M170 290h60" stroke="#9ca3af" '
+    b'stroke-width="8"/></svg>'
+)
+
+
+class Cover(TypedDict):
+    data: bytes
+    etag: str
+
+
+def render_stand_in(isbn: str) -> bytes:
+    digest = hashlib.sha1(isbn.encode()).digest()
+    image = Image.new("RGB", (400, 600), tuple(64 + b // 2 for b in digest[:3]))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((24, 24, 375, 575), outline=(255, 255, 255), width=4)
+    draw.text((48, 280), isbn, fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def check_cover_url(url: str):
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not any(
+        host == allowed or host.endswith(f".{allowed}") for allowed in COVER_HOSTS
+    ):
+        raise ValueError(f"cover host {host!r} is not allowed")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    for *_, address in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP):
+        if not ipaddress.ip_address(address[0]).is_global:
+            raise ValueError(f"cover host {host!r} resolves to {address[0]}")
+
+
+class _CheckedRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_cover_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_CheckedRedirectHandler)
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class CoverCache:
+    def __init__(
+        self,
+        directory: str = COVER_DIR,
+        origin: str = COVER_ORIGIN,
+        source_url: Callable[[str], str | None] | None = None,
+    ):
+        self.directory = directory
+        self.origin = origin
+        self._source_url = source_url
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._failures: dict[str, float] = {}
+        self._etags: dict[str, tuple[int, str]] = {}
+
+    def path(self, isbn: str, size: str) -> str:
+        return os.path.join(self.directory, size, f"{isbn}.webp")
+
+    def _remember_etag(self, path: str, mtime_ns: int, data: bytes) -> str:
+        etag = f'"{hashlib.blake2b(data, digest_size=12).hexdigest()}"'
+        self._etags[path] = (mtime_ns, etag)
+        return etag
+
+    def read(self, isbn: str, size: str) -> Cover | None:
+        path = self.path(isbn, size)
+        try:
+            with open(path, "rb") as f:
+                mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        cached = self._etags.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return Cover(data=data, etag=cached[1])
+        return Cover(data=data, etag=self._remember_etag(path, mtime_ns, data))
+
+    def store(self, isbn: str, data: bytes):
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+        for size, dimensions in THUMBNAIL_SIZES.items():
+            buffer = io.BytesIO()
+            ImageOps.fit(image, dimensions).save(buffer, "WEBP", quality=WEBP_QUALITY)
+            path = self.path(isbn, size)
+            _write_atomic(path, buffer.getvalue())
+            self._remember_etag(path, os.stat(path).st_mtime_ns, buffer.getvalue())
+        self._failures.pop(isbn, None)
+
+    def invalidate(self, isbn: str):
+        for size in THUMBNAIL_SIZES:
+            path = self.path(isbn, size)
+            self._etags.pop(path, None)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        self._failures.pop(isbn, None)
+
+    def _origin_url(self, isbn: str) -> str | None:
+        if self.origin:
+            return self.origin.format(isbn=isbn)
+        return self._source_url(isbn) if self._source_url else None
+
+    def _fetch(self, isbn: str) -> bytes | None:
+        if self.origin == "local":
+            return render_stand_in(isbn)
+        url = self._origin_url(isbn)
+        if not url:
+            return None
+        check_cover_url(url)
+        with _opener.open(url, timeout=FETCH_TIMEOUT_SECONDS) as response:
+            data = response.read(MAX_COVER_BYTES + 1)
+        return data if len(data) <= MAX_COVER_BYTES else None
+
+    def _load(self, isbn: str) -> bool:
+        try:
+            data = self._fetch(isbn)
+            if data is None:
+                return False
+            self.store(isbn, data)
+            return True
+        except Exception as e:
+            logging.warning(f"Could not load cover for ISBN {isbn}: {e}")
+            return False
+
+    async def get(self, isbn: str, size: str) -> Cover | None:
+        cover = self.read(isbn, size)
+        if cover is not None:
+            return cover
+        failed_at = self._failures.get(isbn, -FAILURE_RETRY_SECONDS)
+        if time.monotonic() - failed_at < FAILURE_RETRY_SECONDS:
+            return None
+        task = self._inflight.get(isbn)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._load, isbn))
+            self._inflight[isbn] = task
+            task.add_done_callback(lambda _: self._inflight.pop(isbn, None))
+        if not await asyncio.shield(task):
+            self._failures[isbn] = time.monotonic()
+            return None
+        return self.read(isbn, size)
+
+
+_cover_cache: CoverCache | None = None
+_cover_cache_lock = threading.Lock()
+
+
+def get_cover_cache() -> CoverCache:
+    global _cover_cache
+    if _cover_cache is None:
+        with _cover_cache_lock:
+            if _cover_cache is None:
+                _cover_cache = CoverCache(
+                    source_url=lambda isbn: get_database().cover_url_for_isbn(isbn)
+                )
+    return _cover_cache
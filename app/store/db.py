@@ -0,0 +1,533 @@
+import contextlib
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from app.store.models import Book, BorrowedBook, LoanEvent, Reservation
+
+DB_PATH = os.environ.get("LIBSYS_DB_PATH", "library.db")
+CHANGE_LOG_REVISIONS = 100000
+CHANGE_LOG_PRUNE_EVERY = 1024
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    category TEXT NOT NULL,
+    cover_image_url TEXT NOT NULL,
+    is_available INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    publication_year INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_position ON books (position);
+CREATE INDEX IF NOT EXISTS books_isbn ON books (isbn);
+CREATE INDEX IF NOT EXISTS books_category ON books (category, is_available, position);
+CREATE INDEX IF NOT EXISTS books_available ON books (is_available, position);
+CREATE INDEX IF NOT EXISTS books_title ON books (title COLLATE NOCASE, position);
+CREATE INDEX IF NOT EXISTS books_author ON books (author COLLATE NOCASE, position);
+CREATE TABLE IF NOT EXISTS loans (
+    book_id INTEGER PRIMARY KEY REFERENCES books (id),
+    user_username TEXT NOT NULL,
+    due_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS loans_user ON loans (user_username);
+CREATE INDEX IF NOT EXISTS loans_due ON loans (due_date);
+CREATE TABLE IF NOT EXISTS loan_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    book_id INTEGER NOT NULL,
+    user_username TEXT NOT NULL,
+    category TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    book_id INTEGER NOT NULL REFERENCES books (id),
+    user_username TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    role TEXT NOT NULL,
+    sequence INTEGER PRIMARY KEY AUTOINCREMENT,
+    UNIQUE (book_id, user_username)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('revision', 0);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('fines_accrued_through', 0);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('fines_revision', 0);
+CREATE TABLE IF NOT EXISTS changes (
+    revision INTEGER NOT NULL,
+    book_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_revision ON changes (revision);
+CREATE TABLE IF NOT EXISTS fine_balances (
+    username TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS loan_fines (
+    book_id INTEGER PRIMARY KEY,
+    amount INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    password_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS secrets (
+    name TEXT PRIMARY KEY,
+    value BLOB NOT NULL
+);
+INSERT OR IGNORE INTO secrets (name, value) VALUES ('download', randomblob(32));
+"""
+BOOK_COLUMNS = (
+    "id, title, author, category, cover_image_url, is_available, description, "
+    "isbn, publication_year"
+)
+SORT_COLUMNS = {
+    "title": "title COLLATE NOCASE",
+    "author": "author COLLATE NOCASE",
+    "category": "category",
+    "year": "publication_year",
+    "status": "is_available",
+}
+INSERT_LOAN_EVENT = (
+    "INSERT INTO loan_events (book_id, user_username, category, kind, timestamp) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+ADD_FINE = (
+    "INSERT INTO fine_balances (username, balance) VALUES (?, ?) "
+    "ON CONFLICT (username) DO UPDATE SET balance = balance + excluded.balance"
+)
+BUMP_FINES_REVISION = (
+    "UPDATE meta SET value = (SELECT value + 1 FROM meta WHERE key = 'revision') "
+    "WHERE key = 'fines_revision'"
+)
+INSERT_BOOK = (
+    f"INSERT INTO books ({BOOK_COLUMNS}, position) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+ADD_BOOK = (
+    "INSERT INTO books (title, author, category, cover_image_url, is_available, "
+    "description, isbn, publication_year, position) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _book_row(book: Book, position: int) -> tuple:
+    return (
+        book["id"],
+        book["title"],
+        book["author"],
+        book["category"],
+        book["cover_image_url"],
+        int(book["is_available"]),
+        book["description"],
+        book["isbn"],
+        book["publication_year"],
+        position,
+    )
+
+
+def _event_row(event: LoanEvent) -> tuple:
+    return (
+        event["book_id"],
+        event["user_username"],
+        event["category"],
+        event["kind"],
+        event["timestamp"],
+    )
+
+
+def _row_book(row: tuple) -> Book:
+    return Book(
+        id=row[0],
+        title=row[1],
+        author=row[2],
+        category=row[3],
+        cover_image_url=row[4],
+        is_available=bool(row[5]),
+        description=row[6],
+        isbn=row[7],
+        publication_year=row[8],
+    )
+
+
+class LibraryDatabase:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, cached_statements=256
+        )
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self.synced_revision = self.revision()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            yield self._conn
+            self._conn.execute(
+                "UPDATE meta SET value = value + 1 WHERE key = 'revision'"
+            )
+            revision = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'revision'"
+            ).fetchone()[0]
+            if revision % CHANGE_LOG_PRUNE_EVERY == 0:
+                self._conn.execute(
+                    "DELETE FROM changes WHERE revision <= ?",
+                    (revision - CHANGE_LOG_REVISIONS,),
+                )
+            if revision == self.synced_revision + 1:
+                self.synced_revision = revision
+
+    def _log_changes(self, conn: sqlite3.Connection, book_ids: Iterable[int]):
+        conn.executemany(
+            "INSERT INTO changes (revision, book_id) "
+            "SELECT value + 1, ? FROM meta WHERE key = 'revision'",
+            [(book_id,) for book_id in book_ids],
+        )
+
+    def _write(self, sql: str, params: tuple = ()):
+        with self._transaction() as conn:
+            conn.execute(sql, params)
+
+    def _write_many(self, sql: str, rows):
+        with self._transaction() as conn:
+            conn.executemany(sql, rows)
+
+    def _read(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+    def _meta(self, key: str) -> int:
+        return self._read("SELECT value FROM meta WHERE key = ?", (key,))[0][0]
+
+    def revision(self) -> int:
+        return self._meta("revision")
+
+    def fines_revision(self) -> int:
+        return self._meta("fines_revision")
+
+    def secret(self, name: str) -> bytes:
+        return self._read("SELECT value FROM secrets WHERE name = ?", (name,))[0][0]
+
+    def changes_since(self, revision: int) -> tuple[int, set[int]] | None:
+        with self._lock:
+            current = self.revision()
+            if current - revision > CHANGE_LOG_REVISIONS:
+                return None
+            rows = self._read(
+                "SELECT book_id FROM changes WHERE revision > ? AND revision <= ?",
+                (revision, current),
+            )
+        return current, {row[0] for row in rows}
+
+    def has_books(self) -> bool:
+        return bool(self._read("SELECT 1 FROM books LIMIT 1"))
+
+    def insert_books(self, books: list[Book], positions: list[int]):
+        self._write_many(INSERT_BOOK, map(_book_row, books, positions))
+
+    def insert_loans(self, loans: list[BorrowedBook]):
+        self._write_many(
+            "INSERT OR REPLACE INTO loans (book_id, user_username, due_date) "
+            "VALUES (?, ?, ?)",
+            [(b["book_id"], b["user_username"], b["due_date"]) for b in loans],
+        )
+
+    def insert_rows(self, table: str, columns: tuple[str, ...], rows):
+        self._write_many(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            rows,
+        )
+
+    def add_books(self, books: list[Book]) -> list[tuple[int, int]]:
+        with self._transaction() as conn:
+            front = conn.execute(
+                "SELECT COALESCE(MIN(position), 1) FROM books"
+            ).fetchone()[0]
+            placed = []
+            for position, book in enumerate(books, front - len(books)):
+                cursor = conn.execute(ADD_BOOK, _book_row(book, position)[1:])
+                placed.append((cursor.lastrowid, position))
+            self._log_changes(conn, [book_id for book_id, _ in placed])
+        return placed
+
+    def update_book(self, book: Book):
+        with self._transaction() as conn:
+            self._log_changes(conn, [book["id"]])
+            conn.execute(
+                "UPDATE books SET title = ?, author = ?, category = ?, "
+                "cover_image_url = ?, description = ?, isbn = ?, "
+                "publication_year = ? WHERE id = ?",
+                (
+                    book["title"],
+                    book["author"],
+                    book["category"],
+                    book["cover_image_url"],
+                    book["description"],
+                    book["isbn"],
+                    book["publication_year"],
+                    book["id"],
+                ),
+            )
+
+    def delete_book(self, book_id: int):
+        with self._transaction() as conn:
+            self._log_changes(conn, [book_id])
+            conn.execute("DELETE FROM reservations WHERE book_id = ?", (book_id,))
+            conn.execute("DELETE FROM books WHERE id = ?", (book_id,))
+
+    def load_books(self) -> tuple[list[Book], list[int]]:
+        rows = self._read(
+            f"SELECT {BOOK_COLUMNS}, position FROM books ORDER BY position"
+        )
+        return [_row_book(row) for row in rows], [row[9] for row in rows]
+
+    def get_book(self, book_id: int) -> tuple[Book, int] | None:
+        rows = self._read(
+            f"SELECT {BOOK_COLUMNS}, position FROM books WHERE id = ?", (book_id,)
+        )
+        return (_row_book(rows[0]), rows[0][9]) if rows else None
+
+    def cover_url_for_isbn(self, isbn: str) -> str | None:
+        rows = self._read(
+            "SELECT cover_image_url FROM books WHERE isbn = ? LIMIT 1", (isbn,)
+        )
+        return rows[0][0] if rows else None
+
+    def query_books(
+        self,
+        category: str = "All",
+        availability: str = "all",
+        sort_by: str = "",
+        descending: bool = False,
+        after: list | None = None,
+        limit: int = 20,
+    ) -> list[Book]:
+        clauses = []
+        params: list = []
+        if category != "All":
+            clauses.append("category = ?")
+            params.append(category)
+        if availability != "all":
+            clauses.append("is_available = ?")
+            params.append(int(availability == "available"))
+        direction = "DESC" if descending else "ASC"
+        keys = ["position"]
+        if sort_by in SORT_COLUMNS:
+            keys.insert(0, SORT_COLUMNS[sort_by])
+        if after is not None:
+            placeholders = ", ".join("?" * len(keys))
+            clauses.append(
+                f"({', '.join(keys)}) {'<' if descending else '>'} ({placeholders})"
+            )
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = ", ".join(f"{key} {direction}" for key in keys)
+        rows = self._read(
+            f"SELECT {BOOK_COLUMNS} FROM books {where} ORDER BY {order} LIMIT ?",
+            (*params, limit),
+        )
+        return [_row_book(row) for row in rows]
+
+    def save_loan(self, loan: BorrowedBook, event: LoanEvent | None = None) -> bool:
+        try:
+            with self._transaction() as conn:
+                claimed = conn.execute(
+                    "UPDATE books SET is_available = 0 "
+                    "WHERE id = ? AND is_available = 1",
+                    (loan["book_id"],),
+                ).rowcount
+                if not claimed:
+                    raise sqlite3.IntegrityError(
+                        f"Book {loan['book_id']} is not available"
+                    )
+                conn.execute(
+                    "INSERT INTO loans (book_id, user_username, due_date) "
+                    "VALUES (?, ?, ?)",
+                    (loan["book_id"], loan["user_username"], loan["due_date"]),
+                )
+                if event is not None:
+                    conn.execute(INSERT_LOAN_EVENT, _event_row(event))
+                self._log_changes(conn, [loan["book_id"]])
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def get_loan(self, book_id: int) -> BorrowedBook | None:
+        rows = self._read(
+            "SELECT book_id, user_username, due_date FROM loans WHERE book_id = ?",
+            (book_id,),
+        )
+        if not rows:
+            return None
+        book_id, user_username, due_date = rows[0]
+        return BorrowedBook(
+            book_id=book_id, user_username=user_username, due_date=due_date
+        )
+
+    def _charge_fine(
+        self, conn: sqlite3.Connection, book_id: int, username: str, amount: int
+    ) -> int:
+        if not conn.execute(
+            "SELECT 1 FROM loans WHERE book_id = ? AND user_username = ?",
+            (book_id, username),
+        ).fetchone():
+            return 0
+        row = conn.execute(
+            "SELECT amount FROM loan_fines WHERE book_id = ?", (book_id,)
+        ).fetchone()
+        charge = amount - (row[0] if row else 0)
+        if charge <= 0:
+            return 0
+        conn.execute(
+            "INSERT INTO loan_fines (book_id, amount) VALUES (?, ?) "
+            "ON CONFLICT (book_id) DO UPDATE SET amount = excluded.amount",
+            (book_id, amount),
+        )
+        conn.execute(ADD_FINE, (username, charge))
+        return charge
+
+    def delete_loan(
+        self,
+        book_id: int,
+        event: LoanEvent | None = None,
+        fine: tuple[str, int] | None = None,
+    ) -> bool:
+        with self._transaction() as conn:
+            self._log_changes(conn, [book_id])
+            if event is not None:
+                conn.execute(INSERT_LOAN_EVENT, _event_row(event))
+            charged = self._charge_fine(conn, book_id, *fine) if fine else 0
+            settled = conn.execute(
+                "DELETE FROM loan_fines WHERE book_id = ?", (book_id,)
+            ).rowcount
+            if charged or settled:
+                conn.execute(BUMP_FINES_REVISION)
+            conn.execute("DELETE FROM loans WHERE book_id = ?", (book_id,))
+            conn.execute(
+                "UPDATE books SET is_available = 1 WHERE id = ?", (book_id,)
+            )
+        return bool(charged or settled)
+
+    def load_loans(self) -> list[BorrowedBook]:
+        return [
+            BorrowedBook(book_id=row[0], user_username=row[1], due_date=row[2])
+            for row in self._read(
+                "SELECT book_id, user_username, due_date FROM loans ORDER BY due_date"
+            )
+        ]
+
+    def insert_loan_events(self, events: list[LoanEvent]):
+        self._write_many(INSERT_LOAN_EVENT, map(_event_row, events))
+
+    def loan_events_since(self, event_id: int) -> list[tuple[int, LoanEvent]]:
+        return [
+            (
+                row[0],
+                LoanEvent(
+                    book_id=row[1],
+                    user_username=row[2],
+                    category=row[3],
+                    kind=row[4],
+                    timestamp=row[5],
+                ),
+            )
+            for row in self._read(
+                "SELECT id, book_id, user_username, category, kind, timestamp "
+                "FROM loan_events WHERE id > ? ORDER BY id",
+                (event_id,),
+            )
+        ]
+
+    def save_fines(self, charges: list[tuple[int, str, int]], accrued_through: int):
+        with self._transaction() as conn:
+            self._log_changes(conn, [book_id for book_id, _, _ in charges])
+            charged = [self._charge_fine(conn, *charge) for charge in charges]
+            if any(charged):
+                conn.execute(BUMP_FINES_REVISION)
+            conn.execute(
+                "UPDATE meta SET value = MAX(value, ?) "
+                "WHERE key = 'fines_accrued_through'",
+                (accrued_through,),
+            )
+
+    def load_fines(self) -> tuple[dict[str, int], dict[int, int], int, int]:
+        with self._lock:
+            return (
+                dict(self._read("SELECT username, balance FROM fine_balances")),
+                dict(self._read("SELECT book_id, amount FROM loan_fines")),
+                self._meta("fines_accrued_through"),
+                self.fines_revision(),
+            )
+
+    def save_reservation(self, reservation: Reservation, role: str):
+        with self._transaction() as conn:
+            self._log_changes(conn, [reservation["book_id"]])
+            conn.execute(
+                "INSERT OR IGNORE INTO reservations (book_id, user_username, "
+                "timestamp, role) VALUES (?, ?, ?, ?)",
+                (
+                    reservation["book_id"],
+                    reservation["user_username"],
+                    reservation["timestamp"],
+                    role,
+                ),
+            )
+
+    def delete_reservation(self, book_id: int, username: str):
+        with self._transaction() as conn:
+            self._log_changes(conn, [book_id])
+            conn.execute(
+                "DELETE FROM reservations WHERE book_id = ? AND user_username = ?",
+                (book_id, username),
+            )
+
+    def load_reservations(
+        self, book_id: int | None = None
+    ) -> list[tuple[Reservation, str]]:
+        where = "" if book_id is None else "WHERE book_id = ? "
+        rows = self._read(
+            "SELECT book_id, user_username, timestamp, role FROM reservations "
+            f"{where}ORDER BY sequence",
+            () if book_id is None else (book_id,),
+        )
+        return [
+            (Reservation(book_id=row[0], user_username=row[1], timestamp=row[2]), row[3])
+            for row in rows
+        ]
+
+    def save_user(self, username: str, name: str, role: str, password_hash: str):
+        self._write(
+            "INSERT OR REPLACE INTO users (username, name, role, password_hash) "
+            "VALUES (?, ?, ?, ?)",
+            (username, name, role, password_hash),
+        )
+
+    def load_users(self) -> list[tuple[str, str, str, str]]:
+        return self._read("SELECT username, name, role, password_hash FROM users")
+
+
+_database: LibraryDatabase | None = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> LibraryDatabase:
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = LibraryDatabase()
+    return _database
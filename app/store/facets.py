@@ -0,0 +1,122 @@
+import array
+from collections.abc import Callable
+from app.store.models import Book
+
+ABSENT = 0
+BORROWED = 1
+AVAILABLE = 2
+STATES = {"available": AVAILABLE, "borrowed": BORROWED}
+
+
+class FacetIndex:
+    def __init__(self, books: list[Book] | None = None):
+        self._names: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._category_of = array.array("H")
+        self._state = bytearray()
+        self._category_counts: dict[str, int] = {}
+        self._pair_counts: dict[tuple[str, bool], int] = {}
+        self._count = 0
+        self._available_count = 0
+        for book in books or []:
+            self.add(book)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _count_pair(self, category: str, is_available: bool, delta: int):
+        key = (category, is_available)
+        self._pair_counts[key] = self._pair_counts.get(key, 0) + delta
+
+    def _code(self, category: str) -> int:
+        code = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self._names)
+            self._names.append(category)
+        return code
+
+    def _present(self, book_id: int) -> bool:
+        return book_id < len(self._state) and self._state[book_id] != ABSENT
+
+    def add(self, book: Book):
+        book_id = book["id"]
+        if book_id >= len(self._state):
+            grow = book_id + 1 - len(self._state)
+            self._category_of.extend([0] * grow)
+            self._state.extend(bytes(grow))
+        category = book["category"]
+        self._category_of[book_id] = self._code(category)
+        self._state[book_id] = AVAILABLE if book["is_available"] else BORROWED
+        self._category_counts[category] = self._category_counts.get(category, 0) + 1
+        self._count_pair(category, bool(book["is_available"]), 1)
+        self._count += 1
+        self._available_count += bool(book["is_available"])
+
+    def remove(self, book: Book):
+        book_id = book["id"]
+        if not self._present(book_id):
+            return
+        category = self._names[self._category_of[book_id]]
+        is_available = self._state[book_id] == AVAILABLE
+        self._state[book_id] = ABSENT
+        self._category_counts[category] -= 1
+        self._count_pair(category, is_available, -1)
+        self._count -= 1
+        self._available_count -= is_available
+
+    def update(self, old: Book, new: Book):
+        self.remove(old)
+        self.add(new)
+
+    def set_available(self, book_id: int, is_available: bool):
+        if not self._present(book_id):
+            return
+        if (self._state[book_id] == AVAILABLE) == is_available:
+            return
+        category = self._names[self._category_of[book_id]]
+        self._count_pair(category, not is_available, -1)
+        self._count_pair(category, is_available, 1)
+        self._state[book_id] = AVAILABLE if is_available else BORROWED
+        self._available_count += 1 if is_available else -1
+
+    def categories(self) -> list[str]:
+        return sorted(name for name, count in self._category_counts.items() if count)
+
+    def match(self, category: str, availability: str) -> Callable[[int], bool] | None:
+        state = self._state
+        wanted = STATES.get(availability)
+        if category == "All":
+            if wanted is None:
+                return None
+            return lambda book_id: state[book_id] == wanted
+        code = self._codes.get(category)
+        if code is None:
+            return lambda book_id: False
+        categories = self._category_of
+        if wanted is None:
+            return lambda book_id: (
+                categories[book_id] == code and state[book_id] != ABSENT
+            )
+        return lambda book_id: categories[book_id] == code and state[book_id] == wanted
+
+    def count(self, category: str = "All", availability: str = "all") -> int:
+        if category == "All":
+            if availability == "available":
+                return self._available_count
+            if availability == "borrowed":
+                return self.borrowed_count
+            return self._count
+        if availability == "all":
+            return self._category_counts.get(category, 0)
+        return self._pair_counts.get((category, availability == "available"), 0)
+
+    def category_counts(self, availability: str = "all") -> dict[str, int]:
+        return {
+            category: self.count(category, availability)
+            for category, count in self._category_counts.items()
+            if count
+        }
+
+    @property
+    def borrowed_count(self) -> int:
+        return self._count - self._available_count
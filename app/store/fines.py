@@ -0,0 +1,71 @@
+import datetime
+from collections.abc import Callable
+from app.store.loans import LoanLedger, due_ordinal
+from app.store.models import BorrowedBook
+
+FINE_RATES = {"Student": 25, "Teacher": 10}
+DEFAULT_FINE_RATE = FINE_RATES["Student"]
+MAX_LOAN_FINE = 2000
+
+
+def fine_rate(role: str) -> int:
+    return FINE_RATES.get(role, DEFAULT_FINE_RATE)
+
+
+def format_fine(cents: int) -> str:
+    return f"${cents / 100:,.2f}"
+
+
+class FineLedger:
+    def __init__(
+        self,
+        balances: dict[str, int] | None = None,
+        loan_fines: dict[int, int] | None = None,
+        accrued_through: int = 0,
+        revision: int = 0,
+    ):
+        self._balances = dict(balances or {})
+        self._loan_fines = dict(loan_fines or {})
+        self.accrued_through = accrued_through
+        self.revision = revision
+        self.total = sum(self._balances.values())
+
+    def balance(self, username: str) -> int:
+        return self._balances.get(username, 0)
+
+    def loan_fine(self, book_id: int) -> int:
+        return self._loan_fines.get(book_id, 0)
+
+    def _charge(self, loan: BorrowedBook, day: int, role: str) -> int:
+        overdue_days = day - due_ordinal(loan)
+        if overdue_days <= 0:
+            return 0
+        book_id = loan["book_id"]
+        amount = min(overdue_days * fine_rate(role), MAX_LOAN_FINE)
+        charge = amount - self._loan_fines.get(book_id, 0)
+        if charge <= 0:
+            return 0
+        username = loan["user_username"]
+        self._loan_fines[book_id] = amount
+        self._balances[username] = self._balances.get(username, 0) + charge
+        self.total += charge
+        return charge
+
+    def accrue(
+        self,
+        loans: LoanLedger,
+        day: datetime.date,
+        role_of: Callable[[str], str],
+    ) -> list[BorrowedBook]:
+        ordinal = day.toordinal()
+        charged = [
+            loan
+            for loan in loans.due_before(day)
+            if self._charge(loan, ordinal, role_of(loan["user_username"]))
+        ]
+        self.accrued_through = max(self.accrued_through, ordinal)
+        return charged
+
+    def settle(self, loan: BorrowedBook, day: datetime.date, role: str) -> int:
+        self._charge(loan, day.toordinal(), role)
+        return self._loan_fines.pop(loan["book_id"], 0)
@@ -0,0 +1,79 @@
+import bisect
+import datetime
+from app.store.models import BorrowedBook
+
+
+def due_ordinal(loan: BorrowedBook) -> int:
+    return datetime.date.fromisoformat(loan["due_date"]).toordinal()
+
+
+class LoanLedger:
+    def __init__(self, loans: list[BorrowedBook] | None = None):
+        self._by_book: dict[int, BorrowedBook] = {}
+        self._by_user: dict[str, dict[int, BorrowedBook]] = {}
+        self._ordinals: dict[int, int] = {}
+        self._due: list[tuple[int, int]] = []
+        self._changes = 0
+        self._user_changes: dict[str, int] = {}
+        for loan in loans or []:
+            self.add(loan)
+
+    def __len__(self) -> int:
+        return len(self._by_book)
+
+    def __contains__(self, book_id: int) -> bool:
+        return book_id in self._by_book
+
+    def get(self, book_id: int) -> BorrowedBook | None:
+        return self._by_book.get(book_id)
+
+    def user_generation(self, username: str) -> int:
+        return self._user_changes.get(username, 0)
+
+    def _touch(self, username: str):
+        self._changes += 1
+        self._user_changes[username] = self._changes
+
+    def for_user(self, username: str) -> list[BorrowedBook]:
+        return list(self._by_user.get(username, {}).values())
+
+    def count_for_user(self, username: str) -> int:
+        return len(self._by_user.get(username, ()))
+
+    def add(self, loan: BorrowedBook):
+        book_id = loan["book_id"]
+        self.remove(book_id)
+        ordinal = due_ordinal(loan)
+        self._by_book[book_id] = loan
+        self._by_user.setdefault(loan["user_username"], {})[book_id] = loan
+        self._ordinals[book_id] = ordinal
+        bisect.insort(self._due, (ordinal, book_id))
+        self._touch(loan["user_username"])
+
+    def remove(self, book_id: int) -> BorrowedBook | None:
+        loan = self._by_book.pop(book_id, None)
+        if loan is not None:
+            user_loans = self._by_user[loan["user_username"]]
+            del user_loans[book_id]
+            if not user_loans:
+                del self._by_user[loan["user_username"]]
+            entry = (self._ordinals.pop(book_id), book_id)
+            del self._due[bisect.bisect_left(self._due, entry)]
+            self._touch(loan["user_username"])
+        return loan
+
+    def _position(self, day: datetime.date) -> int:
+        return bisect.bisect_left(self._due, (day.toordinal(),))
+
+    def _loans_at(self, start: int, end: int) -> list[BorrowedBook]:
+        return [self._by_book[book_id] for _, book_id in self._due[start:end]]
+
+    def count_due_before(self, day: datetime.date) -> int:
+        return self._position(day)
+
+    def count_due_between(self, start: datetime.date, end: datetime.date) -> int:
+        end_position = self._position(end + datetime.timedelta(days=1))
+        return max(end_position - self._position(start), 0)
+
+    def due_before(self, day: datetime.date) -> list[BorrowedBook]:
+        return self._loans_at(0, self._position(day))
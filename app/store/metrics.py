@@ -0,0 +1,40 @@
+import os
+import threading
+from typing import TypedDict
+
+PAYLOAD_METRICS_ENABLED = os.environ.get("LIBSYS_PAYLOAD_METRICS", "0") == "1"
+
+
+class PayloadStats(TypedDict):
+    updates: int
+    total_bytes: int
+    max_bytes: int
+    mean_bytes: float
+
+
+class PayloadMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: dict[str, list[int]] = {}
+
+    def record(self, event: str, size: int):
+        with self._lock:
+            stats = self._events.setdefault(event, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += size
+            stats[2] = max(stats[2], size)
+
+    def stats(self) -> dict[str, PayloadStats]:
+        with self._lock:
+            return {
+                event: PayloadStats(
+                    updates=updates,
+                    total_bytes=total,
+                    max_bytes=largest,
+                    mean_bytes=total / updates,
+                )
+                for event, (updates, total, largest) in sorted(self._events.items())
+            }
+
+
+payload_metrics = PayloadMetrics()
@@ -0,0 +1,76 @@
+from typing import TypedDict, Literal
+
+Category = Literal[
+    "Fiction",
+    "Dystopian",
+    "Science Fiction",
+    "Fantasy",
+    "Mystery",
+    "Non-Fiction",
+    "Science",
+    "History",
+    "Biography",
+    "Technology",
+    "Art",
+    "Philosophy",
+    "Romance",
+    "Thriller",
+    "Self-Help",
+    "Business",
+    "Children",
+    "Poetry",
+    "Drama",
+    "Travel",
+]
+
+
+class Book(TypedDict):
+    id: int
+    title: str
+    author: str
+    category: Category
+    cover_image_url: str
+    is_available: bool
+    description: str
+    isbn: str
+    publication_year: int
+
+
+class BorrowedBook(TypedDict):
+    book_id: int
+    user_username: str
+    due_date: str
+
+
+class LoanEvent(TypedDict):
+    book_id: int
+    user_username: str
+    category: str
+    kind: Literal["borrow", "return"]
+    timestamp: str
+
+
+class Notification(TypedDict):
+    id: int
+    user_username: str
+    book_id: int
+    kind: Literal["overdue", "due_soon", "reserved"]
+    message: str
+    due_date: str
+
+
+class BorrowedBookWithDetails(TypedDict):
+    book: Book
+    due_date: str
+
+
+class Reservation(TypedDict):
+    book_id: int
+    user_username: str
+    timestamp: str
+
+
+class CatalogPage(TypedDict):
+    books: list[Book]
+    total: int
+    next_cursor: list | None
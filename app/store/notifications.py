@@ -0,0 +1,132 @@
+import asyncio
+import collections
+import contextlib
+import datetime
+import logging
+import threading
+from collections.abc import Callable
+from app.store.catalog import get_catalog, ready_catalog
+from app.store.loans import LoanLedger
+from app.store.models import Book, BorrowedBook, Notification, Reservation
+
+DUE_SOON_DAYS = 3
+INBOX_SIZE = 50
+NOTIFICATION_TICK_SECONDS = 60
+
+
+class NotificationInbox:
+    def __init__(self, due_soon_days: int = DUE_SOON_DAYS, size: int = INBOX_SIZE):
+        self.due_soon_days = due_soon_days
+        self.size = size
+        self._inboxes: dict[str, collections.deque[Notification]] = {}
+        self._read: dict[str, int] = {}
+        self._sent: set[tuple[int, str, str]] = set()
+        self._next_id = 1
+
+    def _post(self, loan: BorrowedBook, kind: str, message: str):
+        username = loan["user_username"]
+        inbox = self._inboxes.get(username)
+        if inbox is None:
+            inbox = self._inboxes[username] = collections.deque(maxlen=self.size)
+        inbox.append(
+            Notification(
+                id=self._next_id,
+                user_username=username,
+                book_id=loan["book_id"],
+                kind=kind,
+                message=message,
+                due_date=loan["due_date"],
+            )
+        )
+        self._next_id += 1
+
+    def scan(
+        self,
+        loans: LoanLedger,
+        day: datetime.date,
+        book_of: Callable[[int], Book | None],
+    ) -> int:
+        today = day.isoformat()
+        posted = 0
+        active = set()
+        for loan in loans.due_before(
+            day + datetime.timedelta(days=self.due_soon_days + 1)
+        ):
+            kind = "overdue" if loan["due_date"] < today else "due_soon"
+            key = (loan["book_id"], kind, loan["due_date"])
+            active.add(key)
+            if key in self._sent:
+                continue
+            book = book_of(loan["book_id"])
+            if book is None:
+                continue
+            if kind == "overdue":
+                message = f"'{book['title']}' is overdue!"
+            else:
+                message = f"'{book['title']}' is due on {loan['due_date']}."
+            self._post(loan, kind, message)
+            posted += 1
+        self._sent = active
+        return posted
+
+    def notify_reserved(self, reservation: Reservation, book: Book):
+        self._post(
+            BorrowedBook(
+                book_id=reservation["book_id"],
+                user_username=reservation["user_username"],
+                due_date="",
+            ),
+            "reserved",
+            f"'{book['title']}' that you reserved is now available.",
+        )
+
+    def unread(self, username: str) -> list[Notification]:
+        marker = self._read.get(username, 0)
+        unread = []
+        for notification in reversed(self._inboxes.get(username, ())):
+            if notification["id"] <= marker:
+                break
+            unread.append(notification)
+        return unread[::-1]
+
+    def mark_read(self, username: str, notification_id: int):
+        if notification_id > self._read.get(username, 0):
+            self._read[username] = notification_id
+
+
+_inbox: NotificationInbox | None = None
+_inbox_lock = threading.Lock()
+
+
+def get_notification_inbox() -> NotificationInbox:
+    global _inbox
+    if _inbox is None:
+        with _inbox_lock:
+            if _inbox is None:
+                _inbox = NotificationInbox()
+    return _inbox
+
+
+async def scan_due_loans():
+    inbox = get_notification_inbox()
+    scanned = None
+    await ready_catalog()
+    while True:
+        catalog = get_catalog()
+        version = (catalog.loans_generation, datetime.date.today())
+        if version != scanned:
+            try:
+                posted = inbox.scan(catalog.loans, version[1], catalog.get)
+                scanned = version
+                if posted:
+                    logging.info(f"Posted {posted} due-date notifications")
+            except Exception as e:
+                logging.exception(f"Notification scan failed: {e}")
+        await asyncio.sleep(NOTIFICATION_TICK_SECONDS)
+
+
+@contextlib.asynccontextmanager
+async def notifications_lifespan():
+    scanner = asyncio.create_task(scan_due_loans())
+    yield
+    scanner.cancel()
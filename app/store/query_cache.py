@@ -0,0 +1,89 @@
+import collections
+import threading
+import time
+from typing import TypedDict
+
+QUERY_CACHE_SIZE = 512
+QUERY_CACHE_TTL_SECONDS = 300.0
+
+
+class QueryCacheStats(TypedDict):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+    hit_rate: float
+
+
+class QueryCache:
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_SIZE,
+        ttl: float = QUERY_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: collections.OrderedDict[tuple, tuple[float, object]] = (
+            collections.OrderedDict()
+        )
+        self._version: tuple | None = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __getstate__(self) -> dict:
+        return {"max_entries": self.max_entries, "ttl": self.ttl}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["max_entries"], state["ttl"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _check_version(self, version: tuple):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, version: tuple, key: tuple):
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, version: tuple, key: tuple, value):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> QueryCacheStats:
+        lookups = self.hits + self.misses
+        return QueryCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+            size=len(self._entries),
+            hit_rate=self.hits / lookups if lookups else 0.0,
+        )
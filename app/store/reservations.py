@@ -0,0 +1,45 @@
+import bisect
+from app.store.models import Reservation
+
+ROLE_PRIORITY = {"Teacher": 0}
+DEFAULT_PRIORITY = 1
+
+
+class ReservationQueues:
+    def __init__(self):
+        self._queues: dict[int, list[tuple[int, int, Reservation]]] = {}
+        self._members: set[tuple[int, str]] = set()
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def has(self, book_id: int, username: str) -> bool:
+        return (book_id, username) in self._members
+
+    def add(self, reservation: Reservation, role: str) -> bool:
+        key = (reservation["book_id"], reservation["user_username"])
+        if key in self._members:
+            return False
+        self._members.add(key)
+        self._sequence += 1
+        entry = (ROLE_PRIORITY.get(role, DEFAULT_PRIORITY), self._sequence, reservation)
+        bisect.insort(self._queues.setdefault(reservation["book_id"], []), entry)
+        return True
+
+    def for_book(self, book_id: int) -> list[Reservation]:
+        return [entry[2] for entry in self._queues.get(book_id, [])]
+
+    def pop(self, book_id: int) -> Reservation | None:
+        queue = self._queues.get(book_id)
+        if not queue:
+            return None
+        reservation = queue.pop(0)[2]
+        if not queue:
+            del self._queues[book_id]
+        self._members.discard((book_id, reservation["user_username"]))
+        return reservation
+
+    def remove_book(self, book_id: int):
+        for entry in self._queues.pop(book_id, []):
+            self._members.discard((book_id, entry[2]["user_username"]))
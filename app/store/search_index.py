@@ -0,0 +1,177 @@
+import array
+import bisect
+import re
+import numpy as np
+from app.store.models import Book
+
+FIELD_WEIGHTS = {"title": 8, "author": 4, "isbn": 2, "description": 1}
+GRAM_SIZE = 3
+MIN_TOKEN_LENGTH = 2
+MAX_TERM_TOKENS = 64
+WEIGHT_BITS = 4
+WEIGHT_MASK = (1 << WEIGHT_BITS) - 1
+_TOKEN_RE = re.compile("[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+def query_tokens(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _grams(token: str) -> set[str]:
+    if token.isdigit():
+        return {token[:size] for size in range(MIN_TOKEN_LENGTH, GRAM_SIZE + 1)}
+    grams = set()
+    for size in range(MIN_TOKEN_LENGTH, GRAM_SIZE + 1):
+        for i in range(len(token) - size + 1):
+            grams.add(token[i : i + size])
+    return grams
+
+
+def _search_terms(query: str) -> list[str]:
+    terms = query_tokens(query)
+    digits = [term for term in terms if term.isdigit()]
+    if len(digits) > 1:
+        terms = [term for term in terms if not term.isdigit()] + ["".join(digits)]
+    return terms
+
+
+def _book_tokens(book: Book) -> dict[str, int]:
+    weights: dict[str, int] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        if field == "isbn":
+            continue
+        for token in tokenize(str(book[field])):
+            if weights.get(token, 0) < weight:
+                weights[token] = weight
+    isbn_digits = "".join(_TOKEN_RE.findall(book["isbn"].lower()))
+    if len(isbn_digits) >= MIN_TOKEN_LENGTH:
+        weights[isbn_digits] = max(weights.get(isbn_digits, 0), FIELD_WEIGHTS["isbn"])
+    return weights
+
+
+class SearchIndex:
+    def __init__(self, books: list[Book] | None = None):
+        self._postings: dict[str, array.array] = {}
+        self._grams: dict[str, set[str]] = {}
+        entries: dict[str, list[int]] = {}
+        for book in books or []:
+            for token, weight in _book_tokens(book).items():
+                entries.setdefault(token, []).append(book["id"] << WEIGHT_BITS | weight)
+        for token, posting in entries.items():
+            self._add_token(token, array.array("i", sorted(posting)))
+
+    def _add_token(self, token: str, posting: array.array):
+        self._postings[token] = posting
+        for gram in _grams(token):
+            self._grams.setdefault(gram, set()).add(token)
+
+    def add(self, book: Book):
+        for token, weight in _book_tokens(book).items():
+            entry = book["id"] << WEIGHT_BITS | weight
+            posting = self._postings.get(token)
+            if posting is None:
+                self._add_token(token, array.array("i", [entry]))
+            elif posting[-1] < entry:
+                posting.append(entry)
+            else:
+                bisect.insort(posting, entry)
+
+    def remove(self, book: Book):
+        for token in _book_tokens(book):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            index = bisect.bisect_left(posting, book["id"] << WEIGHT_BITS)
+            if index < len(posting) and posting[index] >> WEIGHT_BITS == book["id"]:
+                del posting[index]
+            if not posting:
+                del self._postings[token]
+                for gram in _grams(token):
+                    tokens = self._grams[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._grams[gram]
+
+    def update(self, old: Book, new: Book):
+        self.remove(old)
+        self.add(new)
+
+    def _matching_tokens(self, term: str) -> list[tuple[str, int]]:
+        if len(term) < MIN_TOKEN_LENGTH:
+            tokens = {token for token in self._postings if token.startswith(term)}
+        elif len(term) < GRAM_SIZE or term.isdigit():
+            tokens = {
+                token
+                for token in self._grams.get(term[:GRAM_SIZE], ())
+                if token.startswith(term)
+            }
+        elif len(term) == GRAM_SIZE:
+            tokens = self._grams.get(term, set())
+        else:
+            candidates = None
+            for i in range(len(term) - GRAM_SIZE + 1):
+                grams = self._grams.get(term[i : i + GRAM_SIZE])
+                if not grams:
+                    return []
+                candidates = set(grams) if candidates is None else candidates & grams
+            tokens = {token for token in candidates if term in token}
+        matches = []
+        for token in tokens:
+            if token == term:
+                boost = 4
+            elif token.startswith(term):
+                boost = 2
+            else:
+                boost = 1
+            matches.append((token, boost))
+        if len(term) < GRAM_SIZE:
+            matches.sort(key=lambda match: (-match[1], len(match[0]), match[0]))
+            return matches[:MAX_TERM_TOKENS]
+        return matches
+
+    def _term_scores(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        matches = self._matching_tokens(term)
+        if not matches:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        packed = [
+            np.frombuffer(self._postings[token], np.int32) for token, _ in matches
+        ]
+        ids = np.concatenate([entries >> WEIGHT_BITS for entries in packed])
+        scores = np.concatenate(
+            [
+                (entries & WEIGHT_MASK).astype(np.int64) * boost
+                for entries, (_, boost) in zip(packed, matches)
+            ]
+        )
+        order = np.lexsort((-scores, ids))
+        ids = ids[order]
+        scores = scores[order]
+        first = np.ones(len(ids), bool)
+        first[1:] = ids[1:] != ids[:-1]
+        return ids[first], scores[first]
+
+    def search(self, query: str) -> list[int]:
+        terms = _search_terms(query)
+        if not terms:
+            return []
+        ids = scores = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            term_ids, term_scores = self._term_scores(term)
+            if ids is None:
+                ids, scores = term_ids, term_scores
+            else:
+                ids, left, right = np.intersect1d(
+                    ids, term_ids, assume_unique=True, return_indices=True
+                )
+                scores = scores[left] + term_scores[right]
+            if not len(ids):
+                return []
+        return ids[np.lexsort((ids, -scores))].tolist()
@@ -0,0 +1,37 @@
+import logging
+import os
+import pickle
+
+SNAPSHOT_PATH = os.environ.get("LIBSYS_SNAPSHOT_PATH", "library.snapshot")
+SNAPSHOT_FORMAT = 7
+
+
+def encode_snapshot(payload, revision: int) -> bytes:
+    return pickle.dumps(
+        (SNAPSHOT_FORMAT, revision, payload), protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+
+def write_snapshot(data: bytes, path: str = SNAPSHOT_PATH):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def save_snapshot(payload, revision: int, path: str = SNAPSHOT_PATH):
+    write_snapshot(encode_snapshot(payload, revision), path)
+
+
+def load_snapshot(revision: int, path: str = SNAPSHOT_PATH):
+    try:
+        with open(path, "rb") as f:
+            snapshot_format, snapshot_revision, payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.exception(f"Error reading catalog snapshot: {e}")
+        return None
+    if snapshot_format != SNAPSHOT_FORMAT or snapshot_revision != revision:
+        return None
+    return payload
@@ -0,0 +1,200 @@
+import collections
+import logging
+import mmap
+import os
+import threading
+import time
+import numpy as np
+
+SOURCE_DIRS = ["app"]
+BASE_FILES = ["rxconfig.py", "requirements.txt", ".gitignore"]
+IGNORED_SUFFIXES = (".pyc", ".ico")
+IGNORED_DIRS = {"__pycache__"}
+MAX_VIEW_BYTES = 256 * 1024
+CONTENT_CACHE_BYTES = 8 * 1024 * 1024
+LISTING_CHECK_SECONDS = 2.0
+VIEW_WINDOW_LINES = 500
+INDEX_CHUNK_BYTES = 16 * 1024 * 1024
+LINE_INDEX_CACHE_SIZE = 8
+
+
+class LineIndex:
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        starts = [np.zeros(1, dtype=np.int64)]
+        if size:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                for offset in range(0, size, INDEX_CHUNK_BYTES):
+                    chunk = np.frombuffer(
+                        mm, np.uint8, min(INDEX_CHUNK_BYTES, size - offset), offset
+                    )
+                    starts.append(np.flatnonzero(chunk == 10) + (offset + 1))
+                    del chunk
+        self._starts = np.concatenate(starts)
+        if size and self._starts[-1] == size:
+            self._starts = self._starts[:-1]
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def span(self, start: int, count: int) -> tuple[int, int]:
+        start = min(max(start, 0), len(self))
+        end = start + count
+        return (
+            int(self._starts[start]) if start < len(self) else self.size,
+            int(self._starts[end]) if end < len(self) else self.size,
+        )
+
+
+class SourceTree:
+    def __init__(
+        self,
+        directories: list[str] | None = None,
+        base_files: list[str] | None = None,
+        max_view_bytes: int = MAX_VIEW_BYTES,
+        cache_bytes: int = CONTENT_CACHE_BYTES,
+    ):
+        self.directories = SOURCE_DIRS if directories is None else directories
+        self.base_files = BASE_FILES if base_files is None else base_files
+        self.max_view_bytes = max_view_bytes
+        self.cache_bytes = cache_bytes
+        self._lock = threading.Lock()
+        self._files: list[str] = []
+        self._file_set: set[str] = set()
+        self._dir_stamps: dict[str, int] = {}
+        self._checked_at: float | None = None
+        self._contents: collections.OrderedDict[tuple[str, int, int], str] = (
+            collections.OrderedDict()
+        )
+        self._cached_bytes = 0
+        self._indexes: collections.OrderedDict[tuple[str, int, int], LineIndex] = (
+            collections.OrderedDict()
+        )
+
+    def _walk(self):
+        files = [path for path in self.base_files if os.path.isfile(path)]
+        stamps = {}
+        for directory in self.directories:
+            for root, dirs, names in os.walk(directory):
+                dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+                stamps[root] = os.stat(root).st_mtime_ns
+                files.extend(
+                    os.path.join(root, name)
+                    for name in names
+                    if not name.endswith(IGNORED_SUFFIXES)
+                )
+        self._files = sorted(set(files))
+        self._file_set = set(self._files)
+        self._dir_stamps = stamps
+
+    def _listing_changed(self) -> bool:
+        for directory, stamp in self._dir_stamps.items():
+            try:
+                if os.stat(directory).st_mtime_ns != stamp:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def files(self) -> list[str]:
+        with self._lock:
+            now = time.monotonic()
+            checked_at = self._checked_at
+            if checked_at is None or now - checked_at >= LISTING_CHECK_SECONDS:
+                if checked_at is None or self._listing_changed():
+                    self._walk()
+                self._checked_at = now
+            return self._files
+
+    def stamp(self, path: str) -> tuple[str, int, int] | None:
+        if self._checked_at is None:
+            self.files()
+        if path not in self._file_set:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def _read(self, path: str, size: int) -> str:
+        with open(path, "rb") as f:
+            data = f.read(self.max_view_bytes)
+        text = data.decode("utf-8", errors="replace")
+        if size > self.max_view_bytes:
+            text += (
+                f"\n\n... truncated: showing {self.max_view_bytes:,} of "
+                f"{size:,} bytes ..."
+            )
+        return text
+
+    def read(self, path: str) -> str | None:
+        key = self.stamp(path)
+        if key is None:
+            return None
+        with self._lock:
+            content = self._contents.get(key)
+            if content is not None:
+                self._contents.move_to_end(key)
+                return content
+        try:
+            content = self._read(path, key[2])
+        except OSError as e:
+            logging.exception(f"Error reading file: {e}")
+            return f"Error reading file: {e}"
+        with self._lock:
+            if key not in self._contents:
+                self._contents[key] = content
+                self._cached_bytes += len(content)
+            while self._cached_bytes > self.cache_bytes and len(self._contents) > 1:
+                _, evicted = self._contents.popitem(last=False)
+                self._cached_bytes -= len(evicted)
+        return content
+
+    def line_index(self, path: str) -> LineIndex | None:
+        key = self.stamp(path)
+        if key is None:
+            return None
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+        try:
+            index = LineIndex(path, key[2])
+        except OSError as e:
+            logging.exception(f"Error indexing file: {e}")
+            return None
+        with self._lock:
+            self._indexes[key] = index
+            while len(self._indexes) > LINE_INDEX_CACHE_SIZE:
+                self._indexes.popitem(last=False)
+        return index
+
+    def read_lines(
+        self, path: str, start: int, count: int = VIEW_WINDOW_LINES
+    ) -> str | None:
+        index = self.line_index(path)
+        if index is None:
+            return None
+        begin, end = index.span(start, count)
+        with open(path, "rb") as f:
+            f.seek(begin)
+            data = f.read(min(end - begin, self.max_view_bytes))
+        return data.decode("utf-8", errors="replace")
+
+
+_source_tree: SourceTree | None = None
+_source_tree_lock = threading.Lock()
+
+
+def get_source_tree() -> SourceTree:
+    global _source_tree
+    if _source_tree is None:
+        with _source_tree_lock:
+            if _source_tree is None:
+                _source_tree = SourceTree()
+    return _source_tree
@@ -0,0 +1,185 @@
+import asyncio
+import base64
+import concurrent.futures
+import contextlib
+import hashlib
+import hmac
+import itertools
+import os
+import secrets
+import threading
+import time
+from typing import TypedDict
+from app.store.db import LibraryDatabase, get_database
+
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("LIBSYS_PASSWORD_ITERATIONS", 240000))
+_HASH_ALGORITHM = "pbkdf2_sha256"
+DOWNLOAD_TOKEN_SECONDS = 60
+_hash_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash"
+)
+
+
+class UserRecord(TypedDict):
+    username: str
+    name: str
+    role: str
+    password_hash: str
+
+
+def hash_password(password: str, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    salt = secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return "$".join(
+        [
+            _HASH_ALGORITHM,
+            str(iterations),
+            base64.b64encode(salt).decode(),
+            base64.b64encode(digest).decode(),
+        ]
+    )
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        algorithm, iterations, salt, expected = password_hash.split("$")
+    except ValueError:
+        return False
+    if algorithm != _HASH_ALGORITHM:
+        return False
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", password.encode(), base64.b64decode(salt), int(iterations)
+    )
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+
+async def _run_hasher(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+
+
+def get_initial_users() -> list[tuple[str, str, str, str]]:
+    return [
+        ("librarian", "password", "Admin User", "Librarian"),
+        ("student", "password", "John Doe", "Student"),
+        ("teacher", "password", "Jane Smith", "Teacher"),
+    ]
+
+
+class UserDirectory:
+    def __init__(
+        self,
+        records: list[UserRecord] | None = None,
+        db: LibraryDatabase | None = None,
+    ):
+        self._db = db
+        self._users: dict[str, UserRecord] = {r["username"]: r for r in records or []}
+        self._dummy_hash = hash_password(secrets.token_hex(8))
+        self._download_key = (
+            db.secret("download") if db is not None else secrets.token_bytes(32)
+        )
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._users
+
+    def get(self, username: str) -> UserRecord | None:
+        return self._users.get(username)
+
+    def page(self, offset: int, limit: int) -> list[UserRecord]:
+        return list(itertools.islice(self._users.values(), offset, offset + limit))
+
+    def add(self, record: UserRecord) -> bool:
+        if record["username"] in self._users:
+            return False
+        self._users[record["username"]] = record
+        if self._db is not None:
+            self._db.save_user(
+                record["username"],
+                record["name"],
+                record["role"],
+                record["password_hash"],
+            )
+        self.generation += 1
+        return True
+
+    async def create_user(
+        self, username: str, password: str, name: str, role: str
+    ) -> UserRecord | None:
+        if username in self._users:
+            return None
+        record = UserRecord(
+            username=username,
+            name=name,
+            role=role,
+            password_hash=await _run_hasher(hash_password, password),
+        )
+        return record if self.add(record) else None
+
+    async def authenticate(self, username: str, password: str) -> UserRecord | None:
+        record = self._users.get(username)
+        password_hash = record["password_hash"] if record else self._dummy_hash
+        verified = await _run_hasher(verify_password, password, password_hash)
+        return record if record and verified else None
+
+    def _sign(self, payload: str) -> bytes:
+        return hmac.new(self._download_key, payload.encode(), "sha256").digest()
+
+    def download_token(self, username: str) -> str:
+        payload = f"{username}:{int(time.time()) + DOWNLOAD_TOKEN_SECONDS}"
+        signature = base64.urlsafe_b64encode(self._sign(payload)).decode()
+        return base64.urlsafe_b64encode(f"{payload}:{signature}".encode()).decode()
+
+    def verify_download_token(self, token: str) -> UserRecord | None:
+        try:
+            decoded = base64.urlsafe_b64decode(token).decode()
+            payload, _, signature = decoded.rpartition(":")
+            username, _, expires = payload.rpartition(":")
+            expired = int(expires) < time.time()
+            signature = base64.urlsafe_b64decode(signature)
+        except ValueError:
+            return None
+        if expired or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        return self._users.get(username)
+
+
+_directory: UserDirectory | None = None
+_directory_lock = threading.Lock()
+
+
+def get_user_directory() -> UserDirectory:
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = load_user_directory(get_database())
+    return _directory
+
+
+@contextlib.asynccontextmanager
+async def users_lifespan():
+    await asyncio.to_thread(get_user_directory)
+    yield
+
+
+def load_user_directory(db: LibraryDatabase) -> UserDirectory:
+    records = [
+        UserRecord(username=username, name=name, role=role, password_hash=password_hash)
+        for username, name, role, password_hash in db.load_users()
+    ]
+    directory = UserDirectory(records, db)
+    if records:
+        return directory
+    for username, password, name, role in get_initial_users():
+        directory.add(
+            UserRecord(
+                username=username,
+                name=name,
+                role=role,
+                password_hash=hash_password(password),
+            )
+        )
+    return directory